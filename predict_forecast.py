@@ -1,104 +1,306 @@
+import os
+
+# Each ticker runs in its own worker process, so keep the native libraries
+# single-threaded to avoid oversubscribing the cores.
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('STAN_NUM_THREADS', '1')
+
+import logging
+import threading
+import numpy as np
 import pandas as pd
 from prophet import Prophet
+from prophet.serialize import model_to_json, model_from_json
 import lightgbm as lgb
-from sklearn.multioutput import MultiOutputRegressor
-import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from tqdm import tqdm
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except Exception:
+    CSV_ENGINE = 'c'
 
 # --- Configuration ---
 DATA_PATH = 'data'
 PROCESSED_PATH = os.path.join(DATA_PATH, 'processed')
 PREDICTIONS_PATH = os.path.join(DATA_PATH, 'predictions')
+PROPHET_DIR = os.path.join(PROCESSED_PATH, 'prophet')
+LGBM_DIR = os.path.join(PROCESSED_PATH, 'lightgbm')
+MODELS_PATH = os.path.join(DATA_PATH, 'models')
+PROPHET_MODEL_DIR = os.path.join(MODELS_PATH, 'prophet')
+LGBM_MODEL_DIR = os.path.join(MODELS_PATH, 'lgbm')
 PREDICTION_DAYS = 7
+CPU_COUNT = os.cpu_count() or 1
+TICKER_WORKERS = max(1, int(os.environ.get('TICKER_WORKERS', CPU_COUNT)))
+# Threads per ticker for the four Prophet fits, sized so the two levels together fill the cores.
+PROPHET_THREADS = max(1, CPU_COUNT // TICKER_WORKERS)
+FORCE_RETRAIN = os.environ.get('FORCE_RETRAIN') == '1'
+# 'csv' (read by the screener and API) or 'parquet' (zstd, needs pyarrow).
+PREDICTION_FORMAT = os.environ.get('PREDICTION_FORMAT', 'csv')
+# Only yhat is used, so skip the posterior sampling behind yhat_lower/yhat_upper.
+PROPHET_PARAMS = {
+    'uncertainty_samples': 0,
+    'daily_seasonality': False,
+    'weekly_seasonality': 'auto',
+    'yearly_seasonality': 'auto',
+    'changepoint_prior_scale': 0.05,
+}
+# Small trees for single-ticker data (a few thousand rows x 3 features); one
+# thread per booster since tickers already run in parallel processes.
+LGBM_PARAMS = {
+    'objective': 'regression',
+    'num_leaves': 15,
+    'min_data_in_leaf': 20,
+    'learning_rate': 0.05,
+    'num_threads': 1,
+    'force_col_wise': True,
+    'max_bin': 63,
+    'verbose': -1,
+}
+LGBM_ROUNDS = 200
+# (column, processed-file suffix) for the four per-column Prophet models.
+PROPHET_COLUMNS = (('Open', 'open'), ('High', 'high'), ('Low', 'low'), ('Close', 'close'))
+LGBM_FEATURES = ['MA_7_Close', 'MA_30_Close', 'Lag_1_Close']
+LGBM_TARGETS = ['Open', 'High', 'Low', 'Close']
+LGBM_OUTPUT_COLUMNS = [f'LGBM_{col}' for col in LGBM_TARGETS]
+PREDICTION_COLUMNS = [f'Prophet_{column}' for column, _ in PROPHET_COLUMNS] + LGBM_OUTPUT_COLUMNS
+LGBM_COLUMNS = ['Date', *LGBM_TARGETS, *LGBM_FEATURES]
 
-def run_prediction():
-    """Main function to generate and save 7-day OHLC predictions."""
-    with open('tickersbse.txt', 'r') as f:
-        bse_tickers = [line.strip() for line in f.readlines()]
-    with open('tickersnse.txt', 'r') as f:
-        nse_tickers = [line.strip() for line in f.readlines()]
-    all_tickers = bse_tickers + nse_tickers
+# Prophet and cmdstanpy log every fit at INFO; across a pool those lines all
+# contend for the parent's stderr, so only let errors through.
+for _name in ('prophet', 'cmdstanpy', 'lightgbm'):
+    logging.getLogger(_name).setLevel(logging.ERROR)
 
-    print(f"Starting OHLC predictions for {len(all_tickers)} tickers...")
+# CmdStanPyBackend.fit stores its result on the backend and reads it back, so a
+# backend must never be shared by fits running in different threads.
+_STAN_BACKENDS = threading.local()
+
+def _install_stan_loader():
+    """Make every Prophet() reuse the Stan backend already loaded on its thread."""
+    load_stan_backend = Prophet._load_stan_backend
 
-    for ticker in all_tickers:
-        print(f"\nPredicting for {ticker}...")
-
-        # --- FIX: Convert ticker name to filename format (e.g., FSL.NS -> FSL_NS) ---
-        filename_ticker = ticker.replace('.', '_')
-        
-        # --- Prophet Prediction (Four Models) ---
-        prophet_predictions = {}
-        for column in ['Open', 'High', 'Low', 'Close']:
-            input_file = os.path.join(PROCESSED_PATH, 'prophet', f'{filename_ticker}_{column.lower()}.csv')
-            if not os.path.exists(input_file):
-                print(f"  - Prophet data for {column} not found. Skipping ticker.")
-                prophet_predictions = None
-                break
-            
-            df_prophet = pd.read_csv(input_file)
-            model = Prophet()
-            model.fit(df_prophet)
-            future = model.make_future_dataframe(periods=PREDICTION_DAYS)
-            forecast = model.predict(future)
-            prophet_predictions[f'Prophet_{column}'] = forecast[['ds', 'yhat']].tail(PREDICTION_DAYS).set_index('ds')['yhat']
-        
-        if prophet_predictions:
-            final_prophet_preds = pd.DataFrame(prophet_predictions)
-            final_prophet_preds.index.name = 'Date'
-            print("  - Prophet OHLC prediction complete.")
+    def _load_stan_backend(self, stan_backend):
+        backend = getattr(_STAN_BACKENDS, 'backend', None)
+        if backend is None:
+            load_stan_backend(self, stan_backend)
+            _STAN_BACKENDS.backend = self.stan_backend
         else:
-            continue
+            self.stan_backend = backend
+
+    Prophet._load_stan_backend = _load_stan_backend
+
+def _warm_stan_backend():
+    """Load this thread's Stan backend up front, before its first fit."""
+    Prophet()
 
-        # --- LightGBM Multi-Output Prediction ---
-        lgbm_input_path = os.path.join(PROCESSED_PATH, 'lightgbm', f'{filename_ticker}.csv')
-        if not os.path.exists(lgbm_input_path):
-            print(f"  - LightGBM data not found for {ticker}. Skipping.")
+# Processed input files present on disk, listed once in run_prediction and
+# handed to each worker, so per-ticker existence checks are set lookups.
+_AVAILABLE_INPUTS = None
+
+def _scan_inputs():
+    """Return the paths of all processed input files, using one scandir per directory."""
+    available = set()
+    for folder in (PROPHET_DIR, LGBM_DIR):
+        try:
+            with os.scandir(folder) as it:
+                available.update(os.path.join(folder, entry.name) for entry in it)
+        except FileNotFoundError:
             continue
-            
-        df_lgbm = pd.read_csv(lgbm_input_path, index_col='Date', parse_dates=True)
-        
-        features = ['MA_7_Close', 'MA_30_Close', 'Lag_1_Close']
-        targets = ['Open', 'High', 'Low', 'Close']
-        
-        X = df_lgbm[features]
-        y = df_lgbm[targets]
-        
-        lgbm = lgb.LGBMRegressor()
-        model_lgbm = MultiOutputRegressor(lgbm)
-        model_lgbm.fit(X, y)
-        
-        lgbm_predictions = []
-        last_known_data = df_lgbm.copy()
-
-        for _ in range(PREDICTION_DAYS):
-            last_features = pd.DataFrame({
-                'MA_7_Close': [last_known_data['Close'].iloc[-7:].mean()],
-                'MA_30_Close': [last_known_data['Close'].iloc[-30:].mean()],
-                'Lag_1_Close': [last_known_data['Close'].iloc[-1]]
-            })
-            
-            prediction = model_lgbm.predict(last_features)[0]
-            lgbm_predictions.append(prediction)
-            
-            next_day_index = last_known_data.index[-1] + pd.Timedelta(days=1)
-            new_row_data = {
-                'Open': prediction[0], 'High': prediction[1], 'Low': prediction[2], 'Close': prediction[3]
-            }
-            new_row = pd.DataFrame(new_row_data, index=[next_day_index])
-            last_known_data = pd.concat([last_known_data, new_row])
-
-        future_dates = final_prophet_preds.index
-        final_lgbm_preds = pd.DataFrame(lgbm_predictions, index=future_dates, columns=[f'LGBM_{col}' for col in targets])
-        print("  - LightGBM OHLC prediction complete.")
-
-        # --- Combine and Save Predictions ---
-        final_predictions = final_prophet_preds.join(final_lgbm_preds)
-        output_path = os.path.join(PREDICTIONS_PATH, f'{filename_ticker}_prediction.csv')
+    return frozenset(available)
+
+def _init_worker(available_inputs):
+    global _AVAILABLE_INPUTS
+    _AVAILABLE_INPUTS = available_inputs
+    # Only pool workers fit models, so the parent never touches Stan.
+    _install_stan_loader()
+
+def _input_exists(path):
+    if _AVAILABLE_INPUTS is None:
+        return os.path.exists(path)
+    return path in _AVAILABLE_INPUTS
+
+def _is_up_to_date(output_path, input_paths):
+    """True if output_path exists and is at least as new as every input file."""
+    try:
+        return os.path.getmtime(output_path) >= max(os.path.getmtime(p) for p in input_paths)
+    except OSError:
+        return False
+
+# Workers hand each ticker's small prediction frame back to the parent, which
+# writes it in the background so the workers go straight to the next ticker.
+_IO_EXEC = ThreadPoolExecutor(max_workers=2)
+
+# The four Prophet fits of a ticker run here. cmdstanpy runs the optimizer as a
+# subprocess, so the fits overlap while their threads wait on it. The pool lives
+# for the whole worker process, and each thread loads its own Stan backend once
+# when it starts.
+_PROPHET_EXEC = ThreadPoolExecutor(max_workers=PROPHET_THREADS, initializer=_warm_stan_backend)
+
+def _write_predictions(final_predictions, output_path):
+    if output_path.endswith('.parquet'):
+        final_predictions.to_parquet(output_path, engine='pyarrow', compression='zstd', compression_level=3)
+    else:
         final_predictions.to_csv(output_path)
-        print(f"  -> Combined OHLC predictions saved to {output_path}")
+
+def _fit_prophet_column(dates, values, input_path, model_path):
+    """Fit (or reload) one Prophet model and return its last PREDICTION_DAYS (ds, yhat) arrays."""
+    if not FORCE_RETRAIN and _is_up_to_date(model_path, [input_path]):
+        with open(model_path, 'r') as f:
+            model = model_from_json(f.read())
+    else:
+        model = Prophet(**PROPHET_PARAMS)
+        model.fit(pd.DataFrame({'ds': dates, 'y': values}))
+        with open(model_path, 'w') as f:
+            f.write(model_to_json(model))
+    future = model.make_future_dataframe(periods=PREDICTION_DAYS)
+    forecast = model.predict(future)
+    return forecast['ds'].to_numpy()[-PREDICTION_DAYS:], forecast['yhat'].to_numpy()[-PREDICTION_DAYS:]
+
+def _predict_one(ticker):
+    """Fit both models for a single ticker.
+
+    Returns (message, prediction): message explains why a ticker could not be
+    predicted, and prediction is the (frame, output path) pair still to be written.
+    """
+
+    # --- FIX: Convert ticker name to filename format (e.g., FSL.NS -> FSL_NS) ---
+    filename_ticker = ticker.replace('.', '_')
+
+    prophet_inputs = {
+        column: os.path.join(PROPHET_DIR, f'{filename_ticker}_{suffix}.csv')
+        for column, suffix in PROPHET_COLUMNS
+    }
+    lgbm_input_path = os.path.join(LGBM_DIR, f'{filename_ticker}.csv')
+    output_path = os.path.join(PREDICTIONS_PATH, f'{filename_ticker}_prediction.{PREDICTION_FORMAT}')
+
+    input_paths = [*prophet_inputs.values(), lgbm_input_path]
+    missing = [os.path.basename(p) for p in input_paths if not _input_exists(p)]
+    if missing:
+        return f"{ticker}: processed data not found ({', '.join(missing)}). Skipping ticker.", None
+
+    if not FORCE_RETRAIN and _is_up_to_date(output_path, input_paths):
+        return None, None
+
+    # --- Prophet Prediction (Four Models) ---
+    # The four per-column files are written from the same frame and share one
+    # ds column, so parse the dates once and read only y from the rest.
+    prophet_columns = {}
+    dates = None
+    for column, input_file in prophet_inputs.items():
+        if dates is None:
+            df_column = pd.read_csv(input_file, engine=CSV_ENGINE)
+            dates = pd.to_datetime(df_column['ds'].values, cache=True)
+        else:
+            df_column = pd.read_csv(input_file, usecols=['y'], engine=CSV_ENGINE)
+        prophet_columns[column] = df_column['y'].to_numpy()
+
+    forecasts = list(_PROPHET_EXEC.map(
+        lambda column: _fit_prophet_column(
+            dates, prophet_columns[column], prophet_inputs[column],
+            os.path.join(PROPHET_MODEL_DIR, f'{filename_ticker}_{column.lower()}.json')),
+        prophet_columns))
+
+    # Every column shares the same history, so all four forecasts cover the same dates.
+    future_dates = pd.DatetimeIndex(forecasts[0][0], name='Date')
+    prophet_predictions = np.column_stack([yhat for _, yhat in forecasts])
+
+    # --- LightGBM Multi-Output Prediction ---
+    df_lgbm = pd.read_csv(lgbm_input_path, usecols=LGBM_COLUMNS, engine=CSV_ENGINE)
+    df_lgbm.index = pd.to_datetime(df_lgbm.pop('Date').values, format='%Y-%m-%d', cache=True)
+    df_lgbm.index.name = 'Date'
+
+    # Boosters saved by an earlier run are reused while they are newer than the input.
+    lgbm_model_paths = [os.path.join(LGBM_MODEL_DIR, f'{filename_ticker}_{col.lower()}.txt') for col in LGBM_TARGETS]
+    if not FORCE_RETRAIN and all(_is_up_to_date(p, [lgbm_input_path]) for p in lgbm_model_paths):
+        boosters = tuple(lgb.Booster(model_file=p) for p in lgbm_model_paths)
+    else:
+        # float32 halves the bytes LightGBM reads while binning; 63 bins is plenty for 3 features.
+        X = df_lgbm[LGBM_FEATURES].to_numpy(dtype=np.float32)
+        y = df_lgbm[LGBM_TARGETS].to_numpy(dtype=np.float32)
+
+        # One native booster per target; predicting through lgb.Booster on a raw
+        # ndarray skips the sklearn wrapper and DataFrame conversion on every step.
+        # All four targets share X, so bin it once and let each Dataset reuse the bins.
+        # Keep the boosters as trained rather than letting lgb.train round-trip each
+        # one through a model string; save_model below writes the text form once.
+        base = lgb.Dataset(X, params=LGBM_PARAMS, free_raw_data=True).construct()
+        boosters = tuple(
+            lgb.train(LGBM_PARAMS, lgb.Dataset(X, label=y[:, i], reference=base, free_raw_data=True),
+                      num_boost_round=LGBM_ROUNDS, keep_training_booster=True)
+            for i in range(len(LGBM_TARGETS))
+        )
+        for booster, path in zip(boosters, lgbm_model_paths):
+            booster.save_model(path)
+
+    # Keep the last 30 closes in a small flat buffer with running 7/30-day sums so
+    # each recursive step is a few scalar updates instead of a concat plus two means.
+    # Only the 30-day window feeds the features, so the rest of the history is never copied.
+    history = df_lgbm['Close'].to_numpy(dtype=float)[-30:]
+    closes = np.empty(len(history) + PREDICTION_DAYS)
+    closes[:len(history)] = history
+    end = len(history)
+    sum7 = closes[max(0, end - 7):end].sum()
+    sum30 = closes[max(0, end - 30):end].sum()
+
+    # The feature row and the output matrix are allocated once and filled in place.
+    features_row = np.empty((1, 3), dtype=np.float32)
+    lgbm_predictions = np.empty((PREDICTION_DAYS, len(LGBM_TARGETS)))
+
+    for step in range(PREDICTION_DAYS):
+        features_row[0] = (sum7 / min(7, end), sum30 / min(30, end), closes[end - 1])
+
+        for i, booster in enumerate(boosters):
+            lgbm_predictions[step, i] = booster.predict(features_row, num_iteration=booster.best_iteration, num_threads=1)[0]
+
+        new_close = lgbm_predictions[step, 3]
+        sum7 += new_close - (closes[end - 7] if end >= 7 else 0.0)
+        sum30 += new_close - (closes[end - 30] if end >= 30 else 0.0)
+        closes[end] = new_close
+        end += 1
+
+    # --- Combine and Save Predictions ---
+    # Both blocks are indexed by future_dates already, so stack them instead of joining.
+    final_predictions = pd.DataFrame(
+        np.concatenate([prophet_predictions, lgbm_predictions], axis=1),
+        index=future_dates, columns=PREDICTION_COLUMNS,
+    )
+    return None, (final_predictions, output_path)
+
+def _read_tickers(*paths):
+    """Yield the non-empty ticker lines of each file in turn."""
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                ticker = line.strip()
+                if ticker:
+                    yield ticker
+
+def run_prediction():
+    """Main function to generate and save 7-day OHLC predictions."""
+    all_tickers = list(dict.fromkeys(_read_tickers('tickersbse.txt', 'tickersnse.txt')))
+
+    print(f"Starting OHLC predictions for {len(all_tickers)} tickers...")
+
+    # Tickers are independent and CPU-bound, so fan them out across processes.
+    available_inputs = _scan_inputs()
+    with ProcessPoolExecutor(max_workers=TICKER_WORKERS, initializer=_init_worker, initargs=(available_inputs,)) as ex:
+        results = ex.map(_predict_one, all_tickers, chunksize=4)
+        writes = []
+        for message, prediction in tqdm(results, total=len(all_tickers), desc="Predicting Tickers"):
+            if message:
+                tqdm.write(message)
+            if prediction is not None:
+                writes.append(_IO_EXEC.submit(_write_predictions, *prediction))
+    # Surface any failed write before reporting success.
+    for write in writes:
+        write.result()
+    _IO_EXEC.shutdown(wait=True)
 
     print("\nPrediction process complete.")
 
 if __name__ == "__main__":
     os.makedirs(PREDICTIONS_PATH, exist_ok=True)
-    run_prediction()
\ No newline at end of file
+    os.makedirs(PROPHET_MODEL_DIR, exist_ok=True)
+    os.makedirs(LGBM_MODEL_DIR, exist_ok=True)
+    run_prediction()
@@ -5,18 +5,29 @@
 import sys
 import os
 import traceback
+import csv
+import hashlib
+import functools
+import weakref
+import time
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QLineEdit, QComboBox, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QLineEdit, QComboBox, QTableView,
     QFrame, QHeaderView, QSizePolicy, QAbstractItemView, QTabWidget,
     QSpacerItem, QCheckBox, QMessageBox, QCompleter
 )
 from PyQt6.QtGui import QFont, QPainter, QColor, QLinearGradient, QBrush
-from PyQt6.QtCore import Qt, QSize, QThread, pyqtSignal
+from PyQt6.QtCore import (
+    Qt, QSize, QThread, pyqtSignal, QAbstractTableModel, QModelIndex,
+    QObject, QRunnable, QThreadPool
+)
 
 import matplotlib
 matplotlib.use('qtagg')
@@ -26,18 +37,20 @@ from matplotlib.figure import Figure
 # --- ML/Data Imports ---
 try:
     from prophet import Prophet
+    from prophet.serialize import model_to_json, model_from_json
     PROPHET_AVAILABLE = True
 except Exception:
     PROPHET_AVAILABLE = False
-    Prophet = None
+    Prophet, model_to_json, model_from_json = None, None, None
 
 try:
     import lightgbm as lgb
     from sklearn.multioutput import MultiOutputRegressor
+    from joblib import parallel_backend
     LGBM_AVAILABLE = True
 except Exception:
     LGBM_AVAILABLE = False
-    lgb, MultiOutputRegressor = None, None
+    lgb, MultiOutputRegressor, parallel_backend = None, None, None
 
 try:
     import yfinance as yf
@@ -46,15 +59,118 @@ except Exception:
     YFINANCE_AVAILABLE = False
     yf = None
 
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except Exception:
+    PARQUET_AVAILABLE = False
+
 # --- Constants (relative paths) ---
 PREDICTIONS_PATH = os.path.join('data', 'temp', 'predictions')  # CHANGED: Now temp/predictions
 SCREENER_PREDICTIONS_PATH = os.path.join('data', 'predictions')  # NEW: For market screener
 PROCESSED_PATH = os.path.join('data', 'processed')
 HISTORICAL_PATH = os.path.join('data', 'historical')
+SCREENER_CACHE_FILE = os.path.join('data', 'temp', 'screener_cache.parquet')
+PROPHET_CACHE_PATH = os.path.join('data', 'temp', 'prophet_cache')
+PROPHET_CACHE_MAX_FILES = 50
 
 os.makedirs(PREDICTIONS_PATH, exist_ok=True)
 os.makedirs(SCREENER_PREDICTIONS_PATH, exist_ok=True)
+os.makedirs(PROPHET_CACHE_PATH, exist_ok=True)
+
+OHLC_COLUMNS = ['Open', 'High', 'Low', 'Close']
+# Prices only feed charts and tables, so float32 precision is plenty
+SCREENER_DTYPES = {f'{model}_{col}': 'float32' for model in ('Prophet', 'LGBM') for col in OHLC_COLUMNS}
+
+# One seeded Generator for all synthetic OHLC jitter, used instead of the legacy
+# np.random global, so each batch is a single vectorized draw
+_RNG = np.random.default_rng(42)
+
+
+def _fallback_ohlc(last_close, index, low, high):
+    """Scatter OHLC rows around last_close; low/high are per-column (O, H, L, C) relative bounds."""
+    factors = 1 + _RNG.uniform(low, high, size=(len(index), 4))
+    return pd.DataFrame(last_close * factors, index=index, columns=OHLC_COLUMNS)
+
+
+def _read_screener_prediction(path):
+    """Read one *_prediction.csv and tag it with its stock and exchange; None if unreadable."""
+    filename = os.path.basename(path)
+    try:
+        df = pd.read_csv(path, engine='c',
+                         usecols=lambda c: c == 'Date' or c.startswith(('Prophet_', 'LGBM_')),
+                         dtype=SCREENER_DTYPES, parse_dates=['Date'], cache_dates=True)
+    except Exception as e:
+        print(f"Screener: Skipping file due to error: {filename}, {e}")
+        return None
+    ticker_part = filename.replace("_prediction.csv", "")
+    df['Stock'] = ticker_part.replace("_BO", "").replace("_NS", "")
+    df['Exchange'] = "BSE" if ticker_part.endswith("_BO") else "NSE"
+    return df
+
+def _trailing_mean(cs, window):
+    """Rolling mean (expanding for the first window - 1 rows) from a zero-prefixed cumulative sum."""
+    n = len(cs) - 1
+    window = min(window, n)
+    out = np.empty(n)
+    out[:window] = cs[1:window + 1] / np.arange(1, window + 1)
+    out[window:] = (cs[window + 1:] - cs[1:n - window + 1]) / window
+    return out
+
+
+@functools.lru_cache(maxsize=4)
+def _load_tickers(path, suffix, mtime):
+    """De-duplicated tickers from a ticker file, in file order, with the exchange suffix stripped."""
+    # One read per file; split() also drops blank lines and surrounding whitespace.
+    # The completer matches by substring over every entry, so sorting buys nothing.
+    with open(path, 'r') as f:
+        return tuple(dict.fromkeys(t.replace(suffix, '') for t in f.read().split()))
+
+
+def _tz_naive(df):
+    """Return df with its DatetimeIndex stripped of any timezone."""
+    if getattr(df.index, 'tz', None) is None:
+        return df
+    return df.set_axis(df.index.tz_localize(None), axis=0)
+
+
+def _csv_date_strings(series):
+    """Format a datetime column the way DataFrame.to_csv does by default.
+
+    Date-only when every value falls on midnight, otherwise down to the second.
+    NaT becomes NaN.
+    """
+    values = series.dropna()
+    fmt = '%Y-%m-%d %H:%M:%S' if (values != values.dt.normalize()).any() else '%Y-%m-%d'
+    return series.dt.strftime(fmt)
+
 
+def _prophet_cache_file(ticker, exchange, df_prop, freq, params):
+    """Cache path for a Prophet fit, keyed on the exact training series, frequency and
+    Prophet constructor arguments, so changing any of them retrains instead of reloading."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(df_prop['ds'].to_numpy(dtype='datetime64[ns]').tobytes())
+    h.update(df_prop['y'].to_numpy(dtype=np.float64).tobytes())
+    h.update(freq.encode())
+    h.update(repr(sorted(params.items())).encode())
+    return os.path.join(PROPHET_CACHE_PATH, f"{ticker}_{exchange}_{h.hexdigest()}.json")
+
+
+def _prune_prophet_cache():
+    """Keep only the PROPHET_CACHE_MAX_FILES most recently used models (hits touch their file)."""
+    try:
+        entries = sorted(os.scandir(PROPHET_CACHE_PATH), key=lambda e: e.stat().st_mtime, reverse=True)
+        for entry in entries[PROPHET_CACHE_MAX_FILES:]:
+            os.remove(entry.path)
+    except OSError as e:
+        print(f"Prophet cache cleanup failed: {e}")
+
+# Table foreground colors, parsed once and shared by every cell
+_FG_GREEN = QColor("#20C997")
+_FG_RED = QColor("#E35D6A")
+_FG_BLUE = QColor("#EAF2FF")
+_COL_FG = {'High': _FG_GREEN, 'Close': _FG_GREEN, 'Low': _FG_RED, 'Open': _FG_BLUE}
+_PRICE_COLS = frozenset({'Open', 'High', 'Low', 'Close', 'Prophet_Close'})
 
 # ---------------------------- Custom Gradient Background Widget ----------------------------
 class GradientWidget(QWidget):
@@ -68,18 +184,257 @@ class GradientWidget(QWidget):
         painter.fillRect(self.rect(), QBrush(gradient))
         super().paintEvent(event)
 
+# ---------------------------- Background Ticker List Loader ----------------------------
+class TickerLoaderThread(QThread):
+    loaded = pyqtSignal(dict)
+
+    TICKER_FILES = {'BSE': ('tickersbse.txt', '.BO'), 'NSE': ('tickersnse.txt', '.NS')}
+
+    def run(self):
+        ticker_lists = {}
+        for exchange, (path, suffix) in self.TICKER_FILES.items():
+            try:
+                # The mtime is part of the cache key, so editing a file invalidates it
+                ticker_lists[exchange] = list(_load_tickers(path, suffix, os.path.getmtime(path)))
+            except Exception as e:
+                print(f"Error loading {exchange} tickers: {e}")
+                ticker_lists[exchange] = []
+        self.loaded.emit(ticker_lists)
+
+# ---------------------------- Background Prediction Save ----------------------------
+class _SaveSignals(QObject):
+    saved = pyqtSignal(bool)
+
+
+class SaveRunnable(QRunnable):
+    """Write an analysis result to disk off the GUI thread, then report back via signals.saved."""
+
+    def __init__(self, page, ticker, exchange, historical_df, prophet_df, lgbm_df):
+        super().__init__()
+        self.signals = _SaveSignals()
+        self._page = weakref.ref(page)
+        self._args = (ticker, exchange, historical_df, prophet_df, lgbm_df)
+
+    def run(self):
+        page = self._page()
+        if page is None:
+            return
+        try:
+            saved = page._save_prediction_csv(*self._args)
+        except Exception as e:
+            print(f"Failed to save prediction CSV: {e}")
+            saved = False
+        self.signals.saved.emit(saved)
+
+# ---------------------------- Analysis Table Model ----------------------------
+class PredictionTableModel(QAbstractTableModel):
+    """Read-only table model over a reset-indexed historical or forecast DataFrame.
+
+    A column's cell text is built in one vectorized pass the first time any of its
+    cells is painted, and sorting only permutes a row order array.
+    """
+
+    def __init__(self, df, parent=None):
+        super().__init__(parent)
+        self._df = df
+        self._cols = list(df.columns)
+        self._headers = ['Date' if str(c) == 'index' else str(c) for c in self._cols]
+        self._text = [None] * len(self._cols)
+        self._order = np.arange(len(df))
+        self._colors = [_COL_FG.get(c) for c in self._cols]
+
+    def _column_text(self, column):
+        text = self._text[column]
+        if text is None:
+            col = self._cols[column]
+            series = self._df[col]
+            if col == 'index' and pd.api.types.is_datetime64_any_dtype(series):
+                text = series.dt.strftime('%Y-%m-%d %H:%M').to_numpy(dtype=object)
+            elif pd.api.types.is_numeric_dtype(series):
+                fmt = '₹%.2f' if col in _PRICE_COLS else '%.4f'
+                text = np.char.mod(fmt, series.to_numpy(dtype=np.float64)).astype(object)
+            else:
+                text = series.astype(str).to_numpy(dtype=object)
+            self._text[column] = text
+        return text
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._cols)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._column_text(index.column())[self._order[index.row()]]
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self._colors[index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if not len(self._order):
+            return
+        self.layoutAboutToBeChanged.emit()
+        keys = self._df[self._cols[column]].to_numpy()
+        self._order = np.argsort(keys, kind='stable')
+        if order == Qt.SortOrder.DescendingOrder:
+            self._order = self._order[::-1]
+        self.layoutChanged.emit()
+
+# ---------------------------- Screener Table Model ----------------------------
+class ScreenerModel(QAbstractTableModel):
+    """Read-only table model over a screener DataFrame.
+
+    Cell text and colors are computed once per column, so painting and scrolling
+    never go back through pandas.
+    """
+
+    def __init__(self, df, parent=None):
+        super().__init__(parent)
+        self._cols = df.columns.tolist()
+        self._raw = [df[c].to_numpy() for c in self._cols]
+        self._display = [self._format_column(df[c]) for c in self._cols]
+        self._colors = [self._column_color(c) for c in self._cols]
+
+    @staticmethod
+    def _format_column(series):
+        values = series.to_numpy()
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return np.datetime_as_string(values, unit='D').astype(object)
+        if pd.api.types.is_numeric_dtype(series):
+            return np.char.mod('₹%.2f', values.astype(np.float64)).astype(object)
+        return values.astype(str).astype(object)
+
+    @staticmethod
+    def _column_color(col):
+        # Color coding for price columns
+        if 'High' in col or 'Close' in col: return _FG_GREEN
+        if 'Low' in col: return _FG_RED
+        if 'Open' in col: return _FG_BLUE  # White
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or not self._raw else len(self._raw[0])
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._cols)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display[index.column()][index.row()]
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self._colors[index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._cols[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        # Sort on the underlying values rather than the formatted text
+        if not self._raw:
+            return
+        self.layoutAboutToBeChanged.emit()
+        order_idx = np.argsort(self._raw[column], kind='stable')
+        if order == Qt.SortOrder.DescendingOrder:
+            order_idx = order_idx[::-1]
+        self._raw = [arr[order_idx] for arr in self._raw]
+        self._display = [arr[order_idx] for arr in self._display]
+        self.layoutChanged.emit()
+
 # ---------------------------- Worker for On-Demand Prediction ----------------------------
 class AnalysisWorker(QThread):
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
     progress = pyqtSignal(str)
 
+    # Raw yfinance frames keyed on (yf_ticker, period, interval) -> (fetched_at, df),
+    # shared by every worker so repeat and bulk fetches skip the network for a while. Kept in
+    # LRU order and capped at DOWNLOAD_CACHE_MAX entries.
+    _download_cache = OrderedDict()
+    _download_cache_lock = threading.Lock()
+    # Seconds a cached frame stays fresh, per bar interval: roughly one new bar's worth
+    DOWNLOAD_CACHE_TTLS = {'1m': 60, '1h': 600, '1d': 6 * 3600}
+    DEFAULT_DOWNLOAD_CACHE_TTL = 300
+    DOWNLOAD_CACHE_MAX = 32
+    BULK_CHUNK_SIZE = 20
+
     def __init__(self, ticker, exchange, time_range):
         super().__init__()
         self.ticker = ticker.upper()
         self.exchange = exchange
         self.time_range = time_range
 
+    @classmethod
+    def _cached_download(cls, yf_ticker, period, interval):
+        key = (yf_ticker, period, interval)
+        ttl = cls.DOWNLOAD_CACHE_TTLS.get(interval, cls.DEFAULT_DOWNLOAD_CACHE_TTL)
+        with cls._download_cache_lock:
+            entry = cls._download_cache.get(key)
+            if entry is None or time.time() - entry[0] >= ttl:
+                return None
+            cls._download_cache.move_to_end(key)
+        return entry[1].copy()
+
+    @classmethod
+    def _store_download(cls, yf_ticker, period, interval, df):
+        """Cache a copy of df, dropping expired frames and then the least recently used ones."""
+        now = time.time()
+        with cls._download_cache_lock:
+            for key, (fetched_at, _) in list(cls._download_cache.items()):
+                ttl = cls.DOWNLOAD_CACHE_TTLS.get(key[2], cls.DEFAULT_DOWNLOAD_CACHE_TTL)
+                if now - fetched_at >= ttl:
+                    del cls._download_cache[key]
+            cls._download_cache[(yf_ticker, period, interval)] = (now, df.copy())
+            cls._download_cache.move_to_end((yf_ticker, period, interval))
+            while len(cls._download_cache) > cls.DOWNLOAD_CACHE_MAX:
+                cls._download_cache.popitem(last=False)
+
+    @classmethod
+    def bulk_download(cls, tickers, exchange, period, interval):
+        """Download many tickers in batched yfinance requests; returns {ticker: raw OHLCV frame}."""
+        suffix = 'BO' if exchange == 'BSE' else 'NS'
+        yf_tickers = {f"{t.upper()}.{suffix}": t.upper() for t in tickers}
+        results = {}
+        symbols = []
+        for yf_ticker, ticker in yf_tickers.items():
+            df = cls._cached_download(yf_ticker, period, interval)
+            if df is None:
+                symbols.append(yf_ticker)
+            else:
+                results[ticker] = df
+        for start in range(0, len(symbols), cls.BULK_CHUNK_SIZE):
+            chunk = symbols[start:start + cls.BULK_CHUNK_SIZE]
+            try:
+                data = yf.download(tickers=' '.join(chunk), period=period, interval=interval,
+                                   group_by='ticker', threads=True, progress=False, auto_adjust=True)
+            except Exception as e:
+                print(f"Bulk download failed for {chunk}: {e}")
+                continue
+            for yf_ticker in chunk:
+                if isinstance(data.columns, pd.MultiIndex):
+                    if yf_ticker not in data.columns.get_level_values(0):
+                        continue
+                    df = data[yf_ticker]
+                else:
+                    df = data
+                df = df.dropna(how='all')
+                if df.empty:
+                    continue
+                cls._store_download(yf_ticker, period, interval, df)
+                results[yf_tickers[yf_ticker]] = df
+        return results
+
     def run(self):
         try:
             if not all([PROPHET_AVAILABLE, LGBM_AVAILABLE, YFINANCE_AVAILABLE]):
@@ -121,11 +476,14 @@ class AnalysisWorker(QThread):
             # Get exact historical range for display
             display_df = training_df.tail(hist_periods).copy()
             
-            self.progress.emit("Running Prophet model...")
-            prophet_preds = self._predict_prophet(training_df.copy(), periods, freq)
-            
-            self.progress.emit("Running LightGBM model...")
-            lgbm_preds = self._predict_lightgbm(training_df.copy(), periods, freq)
+            # The models share no state and both fit in native code that releases the GIL,
+            # so run them side by side instead of one after the other.
+            self.progress.emit("Running Prophet + LightGBM in parallel...")
+            with ThreadPoolExecutor(max_workers=2) as ex:
+                prophet_future = ex.submit(self._predict_prophet, training_df.copy(), periods, freq)
+                lgbm_future = ex.submit(self._predict_lightgbm, training_df.copy(), periods, freq)
+                prophet_preds = prophet_future.result()
+                lgbm_preds = lgbm_future.result()
             
             result = {
                 "historical_display": display_df,
@@ -151,16 +509,15 @@ class AnalysisWorker(QThread):
         
         if os.path.exists(processed_lgbm_file):
             print(f"Loading pre-processed daily data for {ticker}...")
-            df = pd.read_csv(processed_lgbm_file, index_col='Date', parse_dates=True)
-            
-            # Ensure we have required columns
-            required_cols = ['Open', 'High', 'Low', 'Close']
-            if all(col in df.columns for col in required_cols):
-                # Clean the data
-                for col in required_cols:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                df = df.dropna(subset=required_cols)
-                return df[required_cols]
+            try:
+                # Read only the OHLC columns, typed up front instead of inferred and coerced
+                df = pd.read_csv(processed_lgbm_file, index_col='Date', parse_dates=['Date'],
+                                 usecols=['Date', *OHLC_COLUMNS], dtype=dict.fromkeys(OHLC_COLUMNS, 'float32'),
+                                 engine='c', cache_dates=True)
+                return df.dropna(subset=OHLC_COLUMNS)
+            except ValueError as e:
+                # Missing or non-numeric OHLC columns
+                print(f"Pre-processed data for {ticker} is unusable: {e}")
         
         # Fallback to yfinance if pre-processed data not available
         print(f"Pre-processed data not found, downloading for {ticker}...")
@@ -171,16 +528,20 @@ class AnalysisWorker(QThread):
         suffix = 'BO' if exchange == 'BSE' else 'NS'
         yf_ticker = f"{ticker}.{suffix}"
         
-        print(f"Downloading data for {yf_ticker} (period={period}, interval={interval})...")
-        try:
-            df = yf.download(yf_ticker, period=period, interval=interval, progress=False, auto_adjust=True)
-        except Exception as e:
-            print(f"Error downloading data: {e}")
-            # Try with a shorter period
-            if period == "7d":
-                df = yf.download(yf_ticker, period="2d", interval=interval, progress=False, auto_adjust=True)
-            else:
-                raise
+        df = self._cached_download(yf_ticker, period, interval)
+        if df is None:
+            print(f"Downloading data for {yf_ticker} (period={period}, interval={interval})...")
+            try:
+                df = yf.download(yf_ticker, period=period, interval=interval, progress=False, auto_adjust=True)
+            except Exception as e:
+                print(f"Error downloading data: {e}")
+                # Try with a shorter period
+                if period == "7d":
+                    df = yf.download(yf_ticker, period="2d", interval=interval, progress=False, auto_adjust=True)
+                else:
+                    raise
+            if not df.empty:
+                self._store_download(yf_ticker, period, interval, df)
         
         if df.empty:
             raise ValueError(f"No data returned from yfinance for {yf_ticker}")
@@ -235,22 +596,46 @@ class AnalysisWorker(QThread):
                 # Assume first column is date
                 df_prop.columns = ['ds', 'y']
             
-            df_prop['ds'] = pd.to_datetime(df_prop['ds']).dt.tz_localize(None)
+            # Only convert / strip the timezone when needed; the loaders already return naive dates
+            ds = df_prop['ds']
+            if not pd.api.types.is_datetime64_any_dtype(ds):
+                ds = pd.to_datetime(ds)
+            if getattr(ds.dt, 'tz', None) is not None:
+                ds = ds.dt.tz_localize(None)
+            df_prop['ds'] = ds
             df_prop = df_prop.dropna()
             
             if len(df_prop) < 10:
                 raise ValueError("Not enough data for Prophet")
             
-            # Configure Prophet based on frequency
-            model = Prophet(
+            # Configure Prophet based on frequency. Intraday series are only a few
+            # dozen points, so scale the changepoints down with the length; the
+            # OHLC spread is synthesized below, so uncertainty sampling is skipped.
+            params = dict(
                 changepoint_prior_scale=0.05,
                 seasonality_prior_scale=10.0,
+                n_changepoints=max(2, min(25, len(df_prop) // 4)),
+                uncertainty_samples=0,
                 weekly_seasonality=(freq == 'D'),
                 daily_seasonality=(freq in ['h', 'min']),
                 yearly_seasonality=False
             )
             
-            model.fit(df_prop)
+            # Reuse a saved fit when this exact series was analyzed with the same settings
+            cache_file = _prophet_cache_file(self.ticker, self.exchange, df_prop, freq, params)
+            if os.path.exists(cache_file):
+                with open(cache_file, 'r') as f:
+                    model = model_from_json(f.read())
+                try:
+                    os.utime(cache_file)  # mark as recently used for _prune_prophet_cache
+                except OSError:
+                    pass
+            else:
+                model = Prophet(**params)
+                model.fit(df_prop)
+                with open(cache_file, 'w') as f:
+                    f.write(model_to_json(model))
+                _prune_prophet_cache()
             
             # Create future dataframe
             future = model.make_future_dataframe(periods=periods, freq=freq, include_history=False)
@@ -265,22 +650,19 @@ class AnalysisWorker(QThread):
             # FIX: Add more realistic variation between Prophet and LightGBM
             volatility = 0.02  # Increased to 2% for more variation
             
-            # Create more varied OHLC values
-            pred_high = pred_close * (1 + np.random.uniform(volatility/2, volatility, len(pred_close)))
-            pred_low = pred_close * (1 - np.random.uniform(volatility/2, volatility, len(pred_close)))
-            pred_open = pred_close * (1 + np.random.uniform(-volatility/2, volatility/2, len(pred_close)))
+            # Create more varied OHLC values (Open, High, Low offsets in one draw)
+            r = _RNG.uniform([-volatility/2, volatility/2, volatility/2],
+                             [volatility/2, volatility, volatility],
+                             size=(len(pred_close), 3)).T
             
             predictions = pd.DataFrame({
-                'Open': pred_open,
-                'High': pred_high, 
-                'Low': pred_low,
+                'Open': pred_close * (1 + r[0]),
+                'High': pred_close * (1 + r[1]),
+                'Low': pred_close * (1 - r[2]),
                 'Close': pred_close
             }, index=preds.index)
             
-            # FIX: Ensure index is timezone-naive
-            if predictions.index.tz is not None:
-                predictions.index = predictions.index.tz_localize(None)
-                
+            # The forecast dates inherit the (already naive) training dates
             return predictions
             
         except Exception as e:
@@ -291,23 +673,19 @@ class AnalysisWorker(QThread):
             last_close = df['Close'].iloc[-1]
             
             # FIX: Create more varied fallback predictions
-            pred_df = pd.DataFrame({
-                'Open': [last_close * (1 + np.random.uniform(-0.01, 0.01)) for _ in range(periods)],
-                'High': [last_close * (1 + np.random.uniform(0.01, 0.03)) for _ in range(periods)],
-                'Low': [last_close * (1 - np.random.uniform(0.01, 0.03)) for _ in range(periods)],
-                'Close': [last_close * (1 + np.random.uniform(-0.02, 0.02)) for _ in range(periods)]
-            }, index=future_dates)
-            
-            return pred_df
+            return _fallback_ohlc(last_close, future_dates,
+                                  low=[-0.01, 0.01, -0.03, -0.02], high=[0.01, 0.03, -0.01, 0.02])
 
     def _predict_lightgbm(self, df, periods, freq):
         """Predict using LightGBM model"""
         try:
             df_l = df.copy()
             
-            # Feature engineering
-            df_l['MA_7_Close'] = df_l['Close'].rolling(window=min(7, len(df_l)), min_periods=1).mean()
-            df_l['MA_30_Close'] = df_l['Close'].rolling(window=min(30, len(df_l)), min_periods=1).mean()
+            # Feature engineering: both moving averages come from one cumulative sum
+            close = df_l['Close'].to_numpy(dtype=np.float64)
+            cs = np.concatenate(([0.0], np.cumsum(close)))
+            df_l['MA_7_Close'] = _trailing_mean(cs, 7)
+            df_l['MA_30_Close'] = _trailing_mean(cs, 30)
             df_l['Lag_1_Close'] = df_l['Close'].shift(1)
             
             # Handle missing values
@@ -330,54 +708,66 @@ class AnalysisWorker(QThread):
             if len(X) < 5:
                 raise ValueError("Not enough valid data for LightGBM")
             
+            # The four targets are independent, so fit them side by side. Each fit is
+            # tiny, so one thread per booster (no nested pools) and threads rather than
+            # joblib's default worker processes, since LightGBM releases the GIL.
             model = MultiOutputRegressor(
                 lgb.LGBMRegressor(
                     n_estimators=50,
                     learning_rate=0.1,
+                    n_jobs=1,
+                    force_col_wise=True,
+                    min_data_in_leaf=2,
                     verbosity=-1,
                     random_state=42
-                )
+                ),
+                n_jobs=len(targets)
             )
-            model.fit(X, y)
-            
-            # Generate predictions
-            predictions = []
-            last_known = df_l.copy()
+            # Fit on plain arrays so the recursive loop can predict on a raw ndarray
+            with parallel_backend('threading'):
+                model.fit(X.to_numpy(dtype=np.float64), y.to_numpy(dtype=np.float64))
             
             # Get appropriate time delta
             delta_map = {'D': pd.Timedelta(days=1), 'h': pd.Timedelta(hours=1), 'min': pd.Timedelta(minutes=1)}
             delta = delta_map.get(freq, pd.Timedelta(days=1))
             
+            # Only the last 30 closes feed the features; keep them in a flat buffer
+            # with room for the predicted closes instead of concatenating DataFrames.
+            history = df_l['Close'].to_numpy(dtype=np.float64)[-30:]
+            closes = np.empty(len(history) + periods)
+            closes[:len(history)] = history
+            end = len(history)
+            
+            # Running 7/30-step sums turn each feature update into two scalar adds
+            sum7 = closes[max(0, end - 7):end].sum()
+            sum30 = closes[max(0, end - 30):end].sum()
+            
+            # Predict through each fitted native booster, skipping the per-call
+            # MultiOutputRegressor / sklearn input validation
+            boosters = [est.booster_ for est in model.estimators_]
+            features_row = np.empty((1, 3))
+            predictions = np.empty((periods, len(targets)))
+            
             for i in range(periods):
                 # Calculate features for prediction
-                current_features = pd.DataFrame({
-                    'MA_7_Close': [last_known['Close'].iloc[-7:].mean()],
-                    'MA_30_Close': [last_known['Close'].iloc[-30:].mean()],
-                    'Lag_1_Close': [last_known['Close'].iloc[-1]]
-                })
-                
-                # Fill any NaN values
-                current_features = current_features.ffill().bfill()
+                features_row[0, 0] = sum7 / min(7, end)
+                features_row[0, 1] = sum30 / min(30, end)
+                features_row[0, 2] = closes[end - 1]
                 
-                # Predict next values
-                pred = model.predict(current_features)[0]
-                predictions.append(pred)
-                
-                # Create new row for next iteration
-                next_idx = last_known.index[-1] + delta
-                new_row = pd.DataFrame({
-                    'Open': [pred[0]], 'High': [pred[1]], 'Low': [pred[2]], 'Close': [pred[3]]
-                }, index=[next_idx])
-                last_known = pd.concat([last_known, new_row])
+                # Predict next values and feed the close back in
+                for k, booster in enumerate(boosters):
+                    predictions[i, k] = booster.predict(features_row)[0]
+                new_close = predictions[i, 3]
+                sum7 += new_close - (closes[end - 7] if end >= 7 else 0.0)
+                sum30 += new_close - (closes[end - 30] if end >= 30 else 0.0)
+                closes[end] = new_close
+                end += 1
             
             # Create final prediction dataframe
             future_idx = pd.date_range(start=df.index[-1] + delta, periods=periods, freq=freq)
             result_df = pd.DataFrame(predictions, index=future_idx, columns=targets)
             
-            # FIX: Ensure index is timezone-naive
-            if result_df.index.tz is not None:
-                result_df.index = result_df.index.tz_localize(None)
-                
+            # future_idx extends the (already naive) training index
             return result_df
             
         except Exception as e:
@@ -387,14 +777,8 @@ class AnalysisWorker(QThread):
             last_close = df['Close'].iloc[-1]
             
             # FIX: Create more varied fallback predictions
-            pred_df = pd.DataFrame({
-                'Open': [last_close * (1 + np.random.uniform(-0.015, 0.015)) for _ in range(periods)],
-                'High': [last_close * (1 + np.random.uniform(0.015, 0.025)) for _ in range(periods)],
-                'Low': [last_close * (1 - np.random.uniform(0.015, 0.025)) for _ in range(periods)],
-                'Close': [last_close * (1 + np.random.uniform(-0.025, 0.025)) for _ in range(periods)]
-            }, index=future_idx)
-            
-            return pred_df
+            return _fallback_ohlc(last_close, future_idx,
+                                  low=[-0.015, 0.015, -0.025, -0.025], high=[0.015, 0.025, -0.015, 0.025])
 
 # ---------------------------- Main Prediction Page Widget ----------------------------
 # Around line 433 in prediction.py
@@ -406,6 +790,9 @@ class Page(GradientWidget):
         self.watchlist = set()
         self.analysis_worker = None
         self.current_analysis_result = None
+        self._last_save_key = None
+        # Analysis table models already built for the current result, by (data_type, id(df), len(df))
+        self._table_models = {}
         self.setStyleSheet(self._get_page_stylesheet())
         
         main_layout = QVBoxLayout(self)
@@ -438,46 +825,74 @@ class Page(GradientWidget):
         self._apply_screener_filters()
 
     def _load_all_predictions(self):
-        all_dfs = []
         if not os.path.exists(SCREENER_PREDICTIONS_PATH):
             print(f"Warning: Main prediction directory not found: {SCREENER_PREDICTIONS_PATH}")
             self.all_predictions_df = pd.DataFrame()
             return
 
-        for filename in os.listdir(SCREENER_PREDICTIONS_PATH):
-            if filename.endswith("_prediction.csv"):
-                try:
-                    df = pd.read_csv(os.path.join(SCREENER_PREDICTIONS_PATH, filename), parse_dates=['Date'])
-                    ticker_part = filename.replace("_prediction.csv", "")
-                    exchange = "BSE" if ticker_part.endswith("_BO") else "NSE"
-                    stock_name = ticker_part.replace("_BO", "").replace("_NS", "")
-                    df['Stock'] = stock_name
-                    df['Exchange'] = exchange
-                    all_dfs.append(df)
-                except Exception as e:
-                    print(f"Screener: Skipping file due to error: {filename}, {e}")
-                    continue
-        self.all_predictions_df = pd.concat(all_dfs, ignore_index=True) if all_dfs else pd.DataFrame()
+        filenames = [f for f in os.listdir(SCREENER_PREDICTIONS_PATH) if f.endswith("_prediction.csv")]
+        paths = [os.path.join(SCREENER_PREDICTIONS_PATH, f) for f in filenames]
+
+        # Reuse the combined parquet cache while no prediction file (or the directory
+        # listing itself) has changed since it was written.
+        signature = max([os.path.getmtime(SCREENER_PREDICTIONS_PATH)] + [os.path.getmtime(p) for p in paths])
+        if PARQUET_AVAILABLE and os.path.exists(SCREENER_CACHE_FILE) and os.path.getmtime(SCREENER_CACHE_FILE) >= signature:
+            try:
+                self.all_predictions_df = pd.read_parquet(SCREENER_CACHE_FILE, engine='pyarrow')
+                return
+            except Exception as e:
+                print(f"Screener: Ignoring unreadable cache {SCREENER_CACHE_FILE}: {e}")
+
+        # read_csv's C parser releases the GIL, so threads overlap parsing with disk reads
+        with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as ex:
+            all_dfs = [df for df in ex.map(_read_screener_prediction, paths) if df is not None]
+
+        if not all_dfs:
+            self.all_predictions_df = pd.DataFrame()
+            return
+
+        df = pd.concat(all_dfs, ignore_index=True)
+        # Filters match on the formatted date, so format it once here rather than per filter change
+        df['Date_Str'] = np.datetime_as_string(df['Date'].to_numpy(dtype='datetime64[ns]'), unit='D')
+        self.all_predictions_df = df
+
+        if PARQUET_AVAILABLE:
+            try:
+                df.to_parquet(SCREENER_CACHE_FILE, engine='pyarrow', compression='snappy', index=False)
+            except Exception as e:
+                print(f"Screener: Could not write cache {SCREENER_CACHE_FILE}: {e}")
 
     def _populate_screener_filters(self):
+        # Offer the dates actually present in the predictions, newest first
+        dates = ['All']
+        if self.all_predictions_df is not None and not self.all_predictions_df.empty:
+            dates += sorted(np.unique(self.all_predictions_df['Date_Str'].to_numpy()).tolist(), reverse=True)
+        
+        # Repopulate quietly; refresh_screener applies the filters once afterwards
+        previous = self.screener_date_filter.currentText()
+        self.screener_date_filter.blockSignals(True)
         self.screener_date_filter.clear()
-        dates = ['All'] + [d.strftime('%Y-%m-%d') for d in pd.date_range('2025-10-01', '2025-10-07')]
         self.screener_date_filter.addItems(dates)
+        if previous in dates:
+            self.screener_date_filter.setCurrentText(previous)
+        self.screener_date_filter.blockSignals(False)
 
     def _apply_screener_filters(self):
         if self.all_predictions_df is None or self.all_predictions_df.empty:
             self._populate_screener_table(pd.DataFrame())
             return
 
-        df = self.all_predictions_df.copy()
-        df['Date_Str'] = df['Date'].dt.strftime('%Y-%m-%d')
+        df = self.all_predictions_df
         exchange = self.screener_exchange_filter.currentText()
         model = self.screener_model_filter.currentText()
         date = self.screener_date_filter.currentText()
         trend = self.screener_trend_filter.currentText()
 
-        if exchange != "All": df = df[df['Exchange'] == exchange]
-        if date != "All": df = df[df['Date_Str'] == date]
+        # Combine both selections into one mask so the frame is sliced once
+        mask = np.ones(len(df), dtype=bool)
+        if exchange != "All": mask &= df['Exchange'].to_numpy() == exchange
+        if date != "All": mask &= df['Date_Str'].to_numpy() == date
+        if not mask.all(): df = df.iloc[np.flatnonzero(mask)]
         
         base_cols = ['Stock', 'Exchange', 'Date']
         if model == "Prophet":
@@ -485,47 +900,27 @@ class Page(GradientWidget):
             if not prophet_cols: 
                 self._populate_screener_table(pd.DataFrame())
                 return
-            df_model = df[base_cols + prophet_cols].copy().dropna(subset=prophet_cols)
+            df_model = df[base_cols + prophet_cols].dropna(subset=prophet_cols)
         else: # LightGBM
             lgbm_cols = [c for c in df.columns if 'LGBM' in c]
             if not lgbm_cols:
                 self._populate_screener_table(pd.DataFrame())
                 return
-            df_model = df[base_cols + lgbm_cols].copy().dropna(subset=lgbm_cols)
+            df_model = df[base_cols + lgbm_cols].dropna(subset=lgbm_cols)
 
         if trend != "All" and 'LGBM_Open' in df_model.columns and 'LGBM_Close' in df_model.columns:
-            change = df_model['LGBM_Close'] - df_model['LGBM_Open']
-            df_model = df_model[change >= 0] if trend == "Advances" else df_model[change < 0]
+            o = df_model['LGBM_Open'].to_numpy()
+            c = df_model['LGBM_Close'].to_numpy()
+            mask = (c >= o) if trend == "Advances" else (c < o)
+            df_model = df_model.iloc[np.flatnonzero(mask)]
         
         self._populate_screener_table(df_model)
 
     def _populate_screener_table(self, df):
-        self.screener_table.clear()
-        self.screener_table.setRowCount(0)
-        self.screener_table.setColumnCount(0)
+        old_model = self.screener_table.model()
+        self.screener_table.setModel(ScreenerModel(df, self.screener_table))
+        if old_model is not None: old_model.deleteLater()
         if df.empty: return
-        headers = list(df.columns)
-        self.screener_table.setColumnCount(len(headers))
-        self.screener_table.setHorizontalHeaderLabels(headers)
-        self.screener_table.setRowCount(len(df))
-        for i, (_, row) in enumerate(df.iterrows()):
-            for j, col in enumerate(headers):
-                val = row[col]
-                if isinstance(val, pd.Timestamp): item_text = val.strftime('%Y-%m-%d')
-                elif isinstance(val, (int, float)): item_text = f"₹{val:.2f}"
-                else: item_text = str(val)
-                item = QTableWidgetItem(item_text)
-                
-                # Color coding for price columns
-                if 'High' in col or 'Close' in col:
-                    item.setForeground(QColor("#20C997"))  # Green
-                elif 'Low' in col:
-                    item.setForeground(QColor("#E35D6A"))  # Red
-                elif 'Open' in col:
-                    item.setForeground(QColor("#EAF2FF"))  # White
-                    
-                self.screener_table.setItem(i, j, item)
-                
         self.screener_table.resizeColumnsToContents()
 
     def _create_analyze_tab(self):
@@ -584,6 +979,17 @@ class Page(GradientWidget):
         self.chart_canvas = FigureCanvas(self.chart_fig)
         chart_layout.addWidget(self.chart_canvas)
         
+        # Style the axes and create the three lines once; each analysis only swaps
+        # their data instead of clearing and re-laying out the whole figure
+        self._style_axes_dark(self.chart_ax)
+        no_dates = np.array([], dtype='datetime64[ns]')
+        self._hist_line, = self.chart_ax.plot(no_dates, [], color='white', linewidth=2, label='Historical')
+        self._prophet_line, = self.chart_ax.plot(no_dates, [], color='#A855F7', linestyle='--', linewidth=2, label='Prophet')
+        self._lgbm_line, = self.chart_ax.plot(no_dates, [], color='#F97316', linestyle='--', linewidth=2, label='LightGBM')
+        self.chart_ax.set_title("Price Prediction Analysis", color="#EAF2FF", fontsize=14, pad=20)
+        self.chart_ax.tick_params(axis='x', rotation=45)
+        self.chart_fig.tight_layout()
+        
         content_layout.addWidget(chart_card, 3)
 
         # Table card
@@ -610,9 +1016,12 @@ class Page(GradientWidget):
         
         table_layout.addLayout(table_header_layout)
         
-        self.analyze_table = QTableWidget()
+        self.analyze_table = QTableView()
         self.analyze_table.setStyleSheet(self._table_style())
         self.analyze_table.setSortingEnabled(True)
+        # Fixed default widths instead of resizeColumnsToContents, which formats every row
+        self.analyze_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.analyze_table.horizontalHeader().setDefaultSectionSize(130)
         table_layout.addWidget(self.analyze_table)
         
         content_layout.addWidget(table_card, 2)
@@ -659,7 +1068,7 @@ class Page(GradientWidget):
         tab_layout.addWidget(controls_frame)
 
         # Table
-        self.screener_table = QTableWidget()
+        self.screener_table = QTableView()
         self.screener_table.setStyleSheet(self._table_style())
         self.screener_table.setSortingEnabled(True)
         tab_layout.addWidget(self.screener_table)
@@ -683,28 +1092,18 @@ class Page(GradientWidget):
         return combo
 
     def _setup_ticker_completer(self):
-        """Setup ticker autocomplete"""
-        try:
-            with open('tickersbse.txt', 'r') as f:
-                bse_list = [line.strip().replace('.BO', '') for line in f.readlines() if line.strip()]
-        except Exception as e:
-            print(f"Error loading BSE tickers: {e}")
-            bse_list = []
-            
-        try:
-            with open('tickersnse.txt', 'r') as f:
-                nse_list = [line.strip().replace('.NS', '') for line in f.readlines() if line.strip()]
-        except Exception as e:
-            print(f"Error loading NSE tickers: {e}")
-            nse_list = []
-            
-        self._ticker_lists = {
-            'BSE': sorted(list(set(bse_list))), 
-            'NSE': sorted(list(set(nse_list)))
-        }
-        
+        """Setup ticker autocomplete; the ticker files are read on a background thread"""
+        self._ticker_lists = {'BSE': [], 'NSE': []}
         self._update_completer()
         self.analyze_exchange.currentTextChanged.connect(self._update_completer)
+        
+        self._ticker_loader = TickerLoaderThread()
+        self._ticker_loader.loaded.connect(self._on_tickers_loaded)
+        self._ticker_loader.start()
+
+    def _on_tickers_loaded(self, ticker_lists):
+        self._ticker_lists = ticker_lists
+        self._update_completer()
 
     def _update_completer(self):
         exchange = self.analyze_exchange.currentText()
@@ -712,6 +1111,7 @@ class Page(GradientWidget):
         completer = QCompleter(ticker_list)
         completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
         completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        completer.setModelSorting(QCompleter.ModelSorting.UnsortedModel)
         self.analyze_search.setCompleter(completer)
 
     def run_analysis(self):
@@ -745,23 +1145,32 @@ class Page(GradientWidget):
         self.progress_label.setText("Analysis completed successfully!")
         
         self.current_analysis_result = result
+        # Models built for the previous result are dropped; the one on screen is
+        # released when the table switches away from it
+        current_model = self.analyze_table.model()
+        for model in self._table_models.values():
+            if model is not current_model:
+                model.deleteLater()
+        self._table_models.clear()
         self.plot_analysis_chart(result['historical_display'], result['prophet'], result['lgbm'])
         
-        # Save predictions
-        try:
-            self._save_prediction_csv(
-                result['ticker'], result['exchange'], 
-                result['historical_display'], result['prophet'], result['lgbm']
-            )
-            self.refresh_screener()
-        except Exception as e:
-            print(f"Failed to save prediction CSV: {e}")
+        # Save predictions in the background; the screener refresh comes back on the GUI thread
+        save_task = SaveRunnable(
+            self, result['ticker'], result['exchange'], 
+            result['historical_display'], result['prophet'], result['lgbm']
+        )
+        save_task.signals.saved.connect(self._on_prediction_saved)
+        QThreadPool.globalInstance().start(save_task)
             
         self._on_hist_fut_toggled(self.hist_fut_switch.isChecked())
         
         QMessageBox.information(self, "Analysis Complete", 
                               f"Analysis for {result['ticker']} completed successfully!")
 
+    def _on_prediction_saved(self, saved):
+        if saved:
+            self.refresh_screener()
+
     def on_analysis_error(self, error_msg):
         self.analyze_search.setEnabled(True)
         self.progress_label.setText("Analysis failed!")
@@ -769,33 +1178,27 @@ class Page(GradientWidget):
 
     def plot_analysis_chart(self, historical, prophet, lgbm):
         """Plot analysis results with proper timeline"""
-        self.chart_ax.clear()
-        self._style_axes_dark(self.chart_ax)
-        
-        # Plot historical data
-        if not historical.empty:
-            self.chart_ax.plot(historical.index, historical['Close'], 
-                              color='white', linewidth=2, label='Historical')
-        
-        # Plot predictions
-        if not prophet.empty and not prophet['Close'].isna().all():
-            self.chart_ax.plot(prophet.index, prophet['Close'], 
-                              color='#A855F7', linestyle='--', linewidth=2, label='Prophet')
-        
-        if not lgbm.empty and not lgbm['Close'].isna().all():
-            self.chart_ax.plot(lgbm.index, lgbm['Close'], 
-                              color='#F97316', linestyle='--', linewidth=2, label='LightGBM')
-        
-        self.chart_ax.set_title("Price Prediction Analysis", color="#EAF2FF", fontsize=14, pad=20)
-        self.chart_ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), 
+        # Historical data, then predictions
+        shown = []
+        for line, df in ((self._hist_line, historical),
+                         (self._prophet_line, prophet),
+                         (self._lgbm_line, lgbm)):
+            # Hand matplotlib plain arrays rather than pandas objects
+            x = df.index.to_numpy()
+            y = df['Close'].to_numpy(dtype=np.float64, na_value=np.nan) if 'Close' in df else np.empty(0)
+            has_data = bool(np.isfinite(y).any())
+            if has_data:
+                line.set_data(x, y)
+                shown.append(line)
+            line.set_visible(has_data)
+        
+        # The legend only lists the lines that are drawn
+        self.chart_ax.legend(handles=shown, loc='upper center', bbox_to_anchor=(0.5, -0.15), 
                             ncol=3, frameon=False, labelcolor='white')
         
-        # Format dates on x-axis
-        if len(historical) > 0:
-            self.chart_ax.tick_params(axis='x', rotation=45)
-        
-        self.chart_fig.tight_layout()
-        self.chart_canvas.draw()
+        self.chart_ax.relim(visible_only=True)
+        self.chart_ax.autoscale_view()
+        self.chart_canvas.draw_idle()
 
     def _on_hist_fut_toggled(self, checked):
         """Toggle between historical and future data in table"""
@@ -806,18 +1209,20 @@ class Page(GradientWidget):
             data = self.current_analysis_result['historical_display']
             data_type = "Historical"
         else:  # Future data
-            # Combine both prediction models
-            prophet_data = self.current_analysis_result['prophet'].copy()
-            lgbm_data = self.current_analysis_result['lgbm'].copy()
-            
-            if not prophet_data.empty and not lgbm_data.empty:
-                # Use LightGBM as primary, add Prophet close
-                data = lgbm_data.copy()
-                data['Prophet_Close'] = prophet_data['Close']
-            elif not lgbm_data.empty:
-                data = lgbm_data
-            else:
-                data = prophet_data
+            # Combine both prediction models once per result (read-only; assign builds the one new frame)
+            data = self.current_analysis_result.get('future_display')
+            if data is None:
+                prophet_data = self.current_analysis_result['prophet']
+                lgbm_data = self.current_analysis_result['lgbm']
+                
+                if not prophet_data.empty and not lgbm_data.empty:
+                    # Use LightGBM as primary, add Prophet close
+                    data = lgbm_data.assign(Prophet_Close=prophet_data['Close'])
+                elif not lgbm_data.empty:
+                    data = lgbm_data
+                else:
+                    data = prophet_data
+                self.current_analysis_result['future_display'] = data
                 
             data_type = "Future Predictions"
             
@@ -825,118 +1230,98 @@ class Page(GradientWidget):
 
     def _populate_analyze_table(self, df, data_type):
         """Populate analysis table with data"""
-        self.analyze_table.clear()
-        self.analyze_table.setRowCount(0)
-        self.analyze_table.setColumnCount(0)
-        
-        if df.empty:
+        # The frames in current_analysis_result only change with a new analysis, so their
+        # identity is a safe key; toggling back to a view reuses its model as-is
+        key = (data_type, id(df), len(df))
+        model = self._table_models.get(key)
+        if model is not None and model is self.analyze_table.model():
             return
-            
-        df_display = df.copy()
-        
-        # Reset index to show dates
-        df_reset = df_display.reset_index()
-        
-        # Set up headers
-        headers = []
-        for col in df_reset.columns:
-            col_name = str(col)
-            if col_name == 'index':
-                headers.append('Date')
-            else:
-                headers.append(col_name)
-                
-        self.analyze_table.setColumnCount(len(headers))
-        self.analyze_table.setHorizontalHeaderLabels(headers)
-        self.analyze_table.setRowCount(len(df_reset))
-        
-        # Populate data
-        for i, row in df_reset.iterrows():
-            for j, col in enumerate(df_reset.columns):
-                val = row[col]
-                if col == 'index' and isinstance(val, pd.Timestamp):
-                    item_text = val.strftime('%Y-%m-%d %H:%M')
-                elif isinstance(val, (int, float)):
-                    if col in ['Open', 'High', 'Low', 'Close', 'Prophet_Close']:
-                        item_text = f"₹{val:.2f}"
-                    else:
-                        item_text = f"{val:.4f}"
-                else:
-                    item_text = str(val)
-                    
-                item = QTableWidgetItem(item_text)
-                
-                # Color coding
-                if col in ['High', 'Close']:
-                    item.setForeground(QColor("#20C997"))
-                elif col == 'Low':
-                    item.setForeground(QColor("#E35D6A"))
-                elif col == 'Open':
-                    item.setForeground(QColor("#EAF2FF"))
-                    
-                self.analyze_table.setItem(i, j, item)
-                
-        self.analyze_table.resizeColumnsToContents()
+        if model is None:
+            # Reset index to show dates
+            df_reset = df.reset_index() if not df.empty else pd.DataFrame()
+            model = PredictionTableModel(df_reset, self.analyze_table)
+            self._table_models[key] = model
+        
+        # Swap the model with repaints, signals and sorting held off, then re-apply the
+        # current sort indicator once
+        table = self.analyze_table
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
+        table.setSortingEnabled(False)
+        try:
+            old_model = table.model()
+            table.setModel(model)
+            if old_model is not None and old_model not in self._table_models.values():
+                old_model.deleteLater()
+        finally:
+            table.blockSignals(False)
+            table.setSortingEnabled(True)
+            table.setUpdatesEnabled(True)
 
     def _save_prediction_csv(self, ticker, exchange, historical_df, prophet_df, lgbm_df):
-        """Save analysis results to CSV in PREDICTIONS_PATH (now data/temp/predictions)"""
+        """Save analysis results to CSV in PREDICTIONS_PATH (now data/temp/predictions)
+
+        Returns False without writing when the same analysis was the last one saved.
+        """
+        suffix = 'BO' if exchange == 'BSE' else 'NS'
+        fname = f"{ticker.replace('.', '_')}_{suffix}_prediction.csv"
+        fullpath = os.path.join(PREDICTIONS_PATH, fname)
+        
+        # Re-running the same ticker over the same dates would rewrite an identical file
+        save_key = (ticker, exchange,
+                    historical_df.index[-1] if len(historical_df) else None,
+                    lgbm_df.index[0] if len(lgbm_df) else None,
+                    lgbm_df.index[-1] if len(lgbm_df) else None,
+                    len(prophet_df), len(lgbm_df))
+        if save_key == self._last_save_key and os.path.exists(fullpath):
+            return False
+        
         # FIX: Ensure all datetime indices are timezone-naive before combining
-        historical_df.index = historical_df.index.tz_localize(None) if historical_df.index.tz is not None else historical_df.index
-        prophet_df.index = prophet_df.index.tz_localize(None) if prophet_df.index.tz is not None else prophet_df.index
-        lgbm_df.index = lgbm_df.index.tz_localize(None) if lgbm_df.index.tz is not None else lgbm_df.index
+        historical_df, prophet_df, lgbm_df = (_tz_naive(d) for d in (historical_df, prophet_df, lgbm_df))
         
         # Prepare historical data
         hist_renamed = historical_df.rename(columns=lambda c: f"Actual_{c}")
         
-        # Prepare future predictions
-        future_data = []
-        
-        # Combine both models' predictions
+        # Combine both models' predictions with one outer join on the forecast dates
+        future_parts = []
         if not prophet_df.empty:
-            for date, row in prophet_df.iterrows():
-                future_data.append({
-                    'Date': date,
-                    'Prophet_Close': row['Close']
-                })
-                
+            future_parts.append(prophet_df[['Close']].rename(columns={'Close': 'Prophet_Close'}))
         if not lgbm_df.empty:
-            for date, row in lgbm_df.iterrows():
-                future_row = {
-                    'Date': date,
-                    'LGBM_Open': row['Open'],
-                    'LGBM_High': row['High'],
-                    'LGBM_Low': row['Low'],
-                    'LGBM_Close': row['Close']
-                }
-                # Merge with existing prophet data
-                existing_idx = None
-                for i, fd in enumerate(future_data):
-                    if fd['Date'] == date:
-                        existing_idx = i
-                        break
-                        
-                if existing_idx is not None:
-                    future_data[existing_idx].update(future_row)
-                else:
-                    future_data.append(future_row)
+            future_parts.append(lgbm_df[OHLC_COLUMNS].rename(columns=lambda c: f"LGBM_{c}"))
+        future_out = (pd.concat(future_parts, axis=1, join='outer').sort_index().rename_axis('Date').reset_index()
+                      if future_parts else pd.DataFrame())
         
         # Create combined dataframe
         historical_out = hist_renamed.reset_index().rename(columns={'index': 'Date'})
-        future_out = pd.DataFrame(future_data)
         
         if not historical_out.empty and not future_out.empty:
+            # Both halves are already in date order, which a stable mergesort handles in one
+            # pass; concat itself no longer copies under pandas' copy-on-write
             combined_out = pd.concat([historical_out, future_out], ignore_index=True)
-            combined_out = combined_out.sort_values('Date')
+            combined_out = combined_out.sort_values('Date', kind='mergesort')
         elif not historical_out.empty:
             combined_out = historical_out
         else:
             combined_out = future_out
             
-        # Save to file in PREDICTIONS_PATH (data/temp/predictions)
-        suffix = 'BO' if exchange == 'BSE' else 'NS'
-        fname = f"{ticker.replace('.', '_')}_{suffix}_prediction.csv"
-        combined_out.to_csv(os.path.join(PREDICTIONS_PATH, fname), index=False)
+        # Save to file in PREDICTIONS_PATH (data/temp/predictions). These frames are
+        # small, so format the dates and float32 prices once (as to_csv would) and stream
+        # rows through csv.writer rather than paying to_csv's setup cost; missing values
+        # are written as empty fields.
+        for col in combined_out.columns:
+            if pd.api.types.is_datetime64_any_dtype(combined_out[col]):
+                combined_out[col] = _csv_date_strings(combined_out[col])
+            elif combined_out[col].dtype == np.float32:
+                # str() keeps float32's shortest form; widening to a Python float would not
+                combined_out[col] = combined_out[col].astype(str).where(combined_out[col].notna())
+        out = combined_out.astype(object).where(combined_out.notna(), '')
+        with open(fullpath, 'w', newline='') as f:
+            writer = csv.writer(f, lineterminator=os.linesep)
+            writer.writerow(out.columns)
+            writer.writerows(out.itertuples(index=False, name=None))
+        self._last_save_key = save_key
         print(f"Saved predictions to {fname}")
+        return True
 
     # --- Style Methods ---
     def _get_page_stylesheet(self): 
@@ -990,8 +1375,8 @@ class Page(GradientWidget):
         
     def _table_style(self): 
         return f"""
-            QTableWidget {{ background: transparent; color: #E6EEF6; border: none; gridline-color: #2B323A; selection-background-color: rgba(42, 166, 166, 0.3); alternate-background-color: rgba(255, 255, 255, 0.02); }} 
-            QTableWidget::item {{ padding: 6px 8px; border-bottom: 1px solid #2B323A; }} 
+            QTableView {{ background: transparent; color: #E6EEF6; border: none; gridline-color: #2B323A; selection-background-color: rgba(42, 166, 166, 0.3); alternate-background-color: rgba(255, 255, 255, 0.02); }} 
+            QTableView::item {{ padding: 6px 8px; border-bottom: 1px solid #2B323A; }} 
             QHeaderView::section {{ background-color: transparent; color: #9aa4b6; font-weight: 600; border: none; padding: 8px; border-bottom: 2px solid #33C4B9; }} 
             {self._scrollbar_style()}
         """
@@ -79,7 +79,19 @@ export function MainChart({ selectedStock, onStockChange }: MainChartProps) {
           return;
         }
         const j = await res.json();
-        const processed = (j.data || []).map((r: any) => ({
+        // backend sends columns ({date: [...], open: [...], ...}); rebuild rows for the chart
+        const cols = j.columns;
+        const rows = cols
+          ? (cols.date || []).map((date: string, i: number) => ({
+              date,
+              open: cols.open?.[i],
+              high: cols.high?.[i],
+              low: cols.low?.[i],
+              close: cols.close?.[i],
+              volume: cols.volume?.[i]
+            }))
+          : (j.data || []);
+        const processed = rows.map((r: any) => ({
           date: r.date,
           open: r.open,
           high: r.high,
@@ -22,10 +22,14 @@ async def get_watchlist_predictions(
 
     # Fetch watchlist symbols from Firestore for the user
     watchlist_ref = db.collection('users', user['uid'], 'watchlist', 'default', 'items')
-    docs = watchlist_ref.stream()
-    symbols = [doc.to_dict().get('symbol') for doc in docs if doc.to_dict().get('symbol')]
-
-    if not symbols:
+    # Only the symbol field is needed, so project it server-side
+    docs = watchlist_ref.select(['symbol']).stream()
+    # One pass over the stream, straight into the lookup set
+    watchlist_set = {doc.to_dict().get('symbol') for doc in docs}
+    watchlist_set.discard(None)
+    watchlist_set.discard('')
+
+    if not watchlist_set:
         return {"items": [], "date": date}
 
     try:
@@ -35,7 +39,6 @@ async def get_watchlist_predictions(
         all_predictions = all_predictions_data.get("items", [])
 
         # Filter the predictions to include only the symbols in the user's watchlist
-        watchlist_set = set(symbols)
         watchlist_predictions = [
             stock for stock in all_predictions if stock['symbol'] in watchlist_set
         ]
@@ -6,12 +6,87 @@ import os
 import csv
 import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-from header_api import get_data_folder, list_tickers, _safe_read_csv_rows
+from header_api import get_data_folder, list_tickers, _safe_read_csv_rows, _csv_row_for_date
+
+# optional: pandas + pyarrow for the on-disk summary snapshot
+try:
+    import pandas as pd
+    import pyarrow  # noqa: F401
+except Exception:
+    pd = None
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# per-folder summary of each ticker's latest row: folder -> (signature, records)
+_SUMMARY_CACHE: Dict[str, tuple] = {}
+SUMMARY_COLUMNS = ["file", "date", "close", "prev_close", "high", "low", "volume"]
+
+
+def _summarize_rows(file_ticker: str, rows: List[Dict]) -> Optional[Dict]:
+    if not rows:
+        return None
+    last = rows[-1]
+    return {
+        "file": file_ticker,
+        "date": last.get("date"),
+        "close": last.get("close"),
+        "prev_close": rows[-2].get("close") if len(rows) >= 2 else None,
+        "high": last.get("high"),
+        "low": last.get("low"),
+        "volume": last.get("volume"),
+    }
+
+
+def _load_exchange_summary(exchange: str, folder: str, tickers: List[Dict]) -> Dict[str, Dict]:
+    """
+    Return {file_ticker: latest-row summary} for every CSV in folder.
+    Rebuilt only when a CSV (or the folder listing) is newer than the cached copy;
+    the snapshot is also kept in data/temp/summary_<exchange>.parquet across restarts.
+    """
+    paths = [os.path.join(folder, f"{t['file'].replace('.', '_')}.csv") for t in tickers]
+    try:
+        signature = max([os.path.getmtime(folder)] + [os.path.getmtime(p) for p in paths if os.path.exists(p)])
+    except OSError:
+        signature = None
+
+    cached = _SUMMARY_CACHE.get(folder)
+    if cached and signature is not None and cached[0] == signature:
+        return cached[1]
+
+    snapshot = Path(folder).parents[1] / "temp" / f"summary_{exchange.upper()}.parquet"
+    summary = None
+    if pd is not None and signature is not None and snapshot.exists() and snapshot.stat().st_mtime >= signature:
+        try:
+            df = pd.read_parquet(snapshot)
+            df = df.astype(object).where(df.notna(), None)
+            summary = {r["file"]: r for r in df.to_dict("records")}
+        except Exception as e:
+            logger.info("_load_exchange_summary: ignoring unreadable snapshot %s: %s", snapshot, e)
+
+    if summary is None:
+        # Reading the CSVs is I/O bound, so load them on a thread pool
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(paths)))) as ex:
+            rows_list = list(ex.map(_safe_read_csv_rows, paths))
+        summary = {}
+        for t, rows in zip(tickers, rows_list):
+            rec = _summarize_rows(t["file"], rows)
+            if rec:
+                summary[t["file"]] = rec
+        if pd is not None and summary:
+            try:
+                snapshot.parent.mkdir(parents=True, exist_ok=True)
+                pd.DataFrame(list(summary.values()), columns=SUMMARY_COLUMNS).to_parquet(snapshot, index=False)
+            except Exception as e:
+                logger.info("_load_exchange_summary: could not write snapshot %s: %s", snapshot, e)
+
+    if signature is not None:
+        _SUMMARY_CACHE[folder] = (signature, summary)
+    return summary
+
+
 @router.get("/api/datatable")
 def api_datatable(exchange: str = "NSE", date: Optional[str] = None):
     """
@@ -36,26 +111,21 @@ def api_datatable(exchange: str = "NSE", date: Optional[str] = None):
             except Exception:
                 pass
 
+        summary = _load_exchange_summary(exchange, folder, tickers)
+        target_iso = target_date.isoformat() if target_date else None
+
         table_rows = []
         for t in tickers:
-            file_ticker = t["file"]
-            path = os.path.join(folder, f"{file_ticker.replace('.', '_')}.csv")
-            rows = _safe_read_csv_rows(path)
-            if not rows:
+            rec = summary.get(t["file"])
+            if not rec:
                 continue
 
-            # Find last available row or by date
-            row = None
-            if target_date:
-                for r in reversed(rows):
-                    try:
-                        if datetime.datetime.strptime(r["date"], "%Y-%m-%d").date() == target_date:
-                            row = r
-                            break
-                    except Exception:
-                        continue
-            if not row:
-                row = rows[-1]  # fallback to latest row
+            # Find last available row or by date; only tickers whose latest row is
+            # not the requested date need a lookup in their CSV
+            row = rec
+            if target_date and rec["date"] != target_iso:
+                path = os.path.join(folder, f"{t['file'].replace('.', '_')}.csv")
+                row = _csv_row_for_date(path, target_date) or rec
 
             if not row or not row.get("close"):
                 continue
@@ -67,13 +137,9 @@ def api_datatable(exchange: str = "NSE", date: Optional[str] = None):
 
             # Determine % change from previous close if available
             change_pct = 0
-            if len(rows) >= 2:
-                try:
-                    prev_close = rows[-2]["close"]
-                    if prev_close:
-                        change_pct = ((close - prev_close) / prev_close) * 100
-                except Exception:
-                    pass
+            prev_close = rec.get("prev_close")
+            if prev_close:
+                change_pct = ((close - prev_close) / prev_close) * 100
 
             table_rows.append({
                 "instrument": t["display"],
@@ -1,17 +1,28 @@
 # header_api.py
+import asyncio
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import os
 import datetime
 import pytz
 from typing import List, Dict, Optional
-import traceback
+import uuid
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import random
 import csv
+import functools
+import json
+import mmap
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
+import numpy as np
 
 # logging
 logging.basicConfig(level=logging.INFO)
@@ -26,15 +37,80 @@ try:
 except Exception:
     yf = None
 
+# optional: pandas for fast CSV parsing
+try:
+    import pandas as pd
+except Exception:
+    pd = None
+
+# optional: orjson for encoding large row payloads
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 # global caches / state
 _SIM_TICK_COUNTER = 0
-_ADVDEC_CACHE = {"adv": 0, "dec": 0, "ts": 0}
-_SIMPLE_CACHE = {}
+_ADVDEC_CACHE = {"adv": 0, "dec": 0, "ts": 0, "usdinr": None, "vix": None}
+_STATUS_STATE = {"status": None, "valid_until": 0.0}  # market status, cached until its next flip
+_SIMPLE_CACHE: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, monotonic expiry)
+_SIMPLE_CACHE_LOCK = threading.Lock()
+# cache keys with a fetch in progress -> Event set when it finishes
+_INFLIGHT: Dict[str, threading.Event] = {}
+_INFLIGHT_LOCK = threading.Lock()
+# exchange -> {csv path: (mtime_ns, last_close, prev_close)}
+_ADVDEC_SNAPSHOT: Dict[str, Dict[str, tuple]] = {}
+# exchanges whose snapshot changed since it was last written, and when that was (monotonic)
+_ADVDEC_DIRTY = set()
+_ADVDEC_SAVED_AT: Dict[str, float] = {}
+# raw CSV header line -> Close column index (None when there is no Close column)
+_HEADER_CACHE: Dict[bytes, Optional[int]] = {}
+# parsed CSV columns: path -> ((mtime_ns, size, max_rows), columns, encoded columns JSON or None,
+#                              (date ordinals, sorted flag) or None)
+_CSV_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_CSV_CACHE_LOCK = threading.Lock()
+# yf.Ticker objects for the FX/VIX symbols, reused across refreshes
+_TICKER_CACHE: Dict[str, object] = {}
+# ticker listings: exchange -> ((folder, folder mtime_ns), (entries, dicts))
+_TICKERS_BY_MTIME: Dict[str, tuple] = {}
+# ticker resolution lookups: exchange -> ((folder, folder mtime_ns), index dict)
+_RESOLVE_CACHE: Dict[str, tuple] = {}
+# keep-alive session for HTTP fallbacks (reuses TCP/TLS connections across cache misses)
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                    max_retries=Retry(total=2, backoff_factor=0.2)))
+_HTTP.headers.update({"Accept-Encoding": "gzip, deflate"})
+# shared pool for blocking file reads (I/O bound, so threads overlap well)
+_IO_POOL = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4), thread_name_prefix="header-io")
 
 # constants
 SUFFIXES = (".BO", "_BO", ".NS", "_NS", "-EQ", "-BE", "-BZ")
+_SUFFIX_RE = re.compile("(?:" + "|".join(re.escape(sfx) for sfx in SUFFIXES) + ")+$")
 INR_SYMBOLS = ["INR=X"]
+IST = pytz.timezone("Asia/Kolkata")
+MARKET_OPEN = datetime.time(9, 15)
+MARKET_CLOSE = datetime.time(15, 30)
 VIX_SYMBOLS = ["^INDIAVIX", "^VIX"]
+SIMPLE_CACHE_MAX = 1024
+INFLIGHT_WAIT = 5
+TAIL_MMAP_MIN_BYTES = 8192
+CSV_CACHE_MAX_FILES = 1024  # both exchanges' folders (~500 files each), so a full sweep stays cached
+HEADER_CACHE_MAX = 256
+ADVDEC_PERSIST_INTERVAL = 300
+YF_BATCH_SIZE = 50
+SPARK_URL = "https://query1.finance.yahoo.com/v8/finance/spark"
+SPARK_BATCH_SIZE = 20
+FX_REFRESH_INTERVAL = 60
+ADVDEC_TTL = 10
+# output key -> source column names in lookup order
+ROW_FIELDS = {
+    "date": ("date", "Date", "DATE"),
+    "open": ("open", "Open", "OPEN"),
+    "high": ("high", "High", "HIGH"),
+    "low": ("low", "Low", "LOW"),
+    "close": ("close", "Close", "CLOSE", "adj close", "Adj Close"),
+    "volume": ("volume", "Volume", "VOLUME"),
+}
 
 
 # ---------------- utility: data folder resolution ----------------
@@ -42,8 +118,17 @@ def get_data_folder(exchange: str = "NSE") -> Optional[str]:
     """
     Resolve the absolute folder path for historical CSVs for the given exchange.
     Tries several likely locations and returns the first valid path or None.
+    Successful lookups are memoized; misses are retried on the next call.
     """
     exch = (exchange or "NSE").upper()
+    folder = _resolve_data_folder(exch)
+    if folder is None:
+        _resolve_data_folder.cache_clear()
+    return folder
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_data_folder(exch: str) -> Optional[str]:
     candidates = []
 
     # 1) data/historical/<exchange> relative to current working directory
@@ -73,31 +158,63 @@ def get_data_folder(exchange: str = "NSE") -> Optional[str]:
 def clean_ticker(name: str) -> str:
     if not name:
         return name
-    n = name.upper()
-    for s in SUFFIXES:
-        if n.endswith(s):
-            n = n[: -len(s)]
-    return n
+    return _SUFFIX_RE.sub("", name.upper())
 
 
 def list_tickers(exchange: str = "NSE") -> List[Dict]:
     """
     Return list of dicts: {'display': 'INFY', 'file': 'INFY.NS'}.
     Uses get_data_folder() to find real folder locations.
+    Cached until the folder's mtime changes; treat the result as read-only.
+    """
+    return _ticker_listing(exchange)[1]
+
+
+def _ticker_entries(exchange: str = "NSE") -> List[tuple]:
+    """
+    Cached list of (display, file, fullpath) tuples for the exchange's CSVs,
+    so hot loops don't rebuild paths per ticker.
     """
-    out = []
-    folder = get_data_folder(exchange)
+    return _ticker_listing(exchange)[0]
+
+
+def _ticker_listing(exchange: str = "NSE") -> tuple:
+    """(entries, dicts) for the exchange, rescanned only when the folder's mtime changes."""
+    exch = (exchange or "NSE").upper()
+    folder = get_data_folder(exch)
     if not folder:
-        return out
+        return [], []
     try:
-        for f in sorted(os.listdir(folder)):
-            if not f.lower().endswith(".csv"):
-                continue
-            file_ticker = os.path.splitext(f)[0].replace('_', '.')
-            out.append({"display": clean_ticker(file_ticker), "file": file_ticker})
+        sig = (folder, os.stat(folder).st_mtime_ns)
+        cached = _TICKERS_BY_MTIME.get(exch)
+        if cached and cached[0] == sig:
+            return cached[1]
+        with os.scandir(folder) as it:
+            names = sorted(e.name for e in it if e.name.lower().endswith(".csv"))
+        prefix = os.path.join(folder, "")
+        entries = []
+        for name in names:
+            file_ticker = name[:-4].replace('_', '.')
+            entries.append((clean_ticker(file_ticker), file_ticker, prefix + name))
+        listing = (entries, [{"display": d, "file": f} for d, f, _ in entries])
     except Exception as e:
         logger.exception("list_tickers error: %s", e)
-    return out
+        return [], []
+    _TICKERS_BY_MTIME[exch] = (sig, listing)
+    return listing
+
+
+def _close_index(header: bytes) -> Optional[int]:
+    """Index of the Close column for a raw header line; cached per distinct header."""
+    try:
+        return _HEADER_CACHE[header]
+    except KeyError:
+        pass
+    cols = [c.strip().lower() for c in header.decode(errors="ignore").strip().split(",")]
+    idx = cols.index("close") if "close" in cols else None
+    if len(_HEADER_CACHE) < HEADER_CACHE_MAX:
+        _HEADER_CACHE[header] = idx
+    return idx
 
 
 def read_last_n_close_values(path: str, n: int = 2) -> List[Optional[float]]:
@@ -105,40 +222,50 @@ def read_last_n_close_values(path: str, n: int = 2) -> List[Optional[float]]:
     Efficiently read the last n rows' Close column values by reading tail of file.
     Returns list of floats (most-recent last) or empty list on failure.
     """
-    if not os.path.exists(path) or os.path.getsize(path) < 16:
-        return []
     try:
         with open(path, "rb") as f:
-            header = f.readline().decode(errors="ignore").strip()
-            cols = [c.strip().lower() for c in header.split(",")]
-            if "close" not in cols:
+            size = os.fstat(f.fileno()).st_size
+            if size < 16:
                 return []
-            close_idx = cols.index("close")
-
-            block = 4096
-            while True:
-                try:
-                    f.seek(-block, os.SEEK_END)
-                except OSError:
-                    f.seek(0)
-                data = f.read().decode(errors="ignore").splitlines()
-                lines = [ln for ln in data if ln.strip()]
-                if len(lines) > 1:
-                    last_lines = lines[-n:]
-                    vals = []
-                    for ln in last_lines:
-                        parts = ln.split(",")
-                        if len(parts) <= close_idx:
-                            vals.append(None)
-                        else:
-                            try:
-                                vals.append(float(parts[close_idx]))
-                            except:
-                                vals.append(None)
-                    return vals
-                if block > 1024 * 1024:
+            # small files in one read, larger ones mapped; both support find/rfind/slicing
+            buf = f.read() if size <= TAIL_MMAP_MIN_BYTES else mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                hdr_end = buf.find(b"\n")
+                if hdr_end < 0:
                     return []
-                block *= 2
+                close_idx = _close_index(bytes(buf[:hdr_end]))
+                if close_idx is None:
+                    return []
+                body_start = hdr_end + 1
+
+                # walk back over n newlines; only that slice is copied out of the map
+                end = size
+                while end > body_start and buf[end - 1] in (10, 13):
+                    end -= 1
+                pos = end
+                for _ in range(n):
+                    pos = buf.rfind(b"\n", body_start, pos)
+                    if pos < 0:
+                        pos = body_start
+                        break
+                tail = buf[pos:end]
+            finally:
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+
+        # stay in bytes: split each line only up to the Close field and float() that slice
+        lines = [ln for ln in tail.split(b"\n") if ln.strip()]
+        vals = []
+        for ln in lines[-n:]:
+            parts = ln.split(b",", close_idx + 1)
+            if len(parts) <= close_idx:
+                vals.append(None)
+            else:
+                try:
+                    vals.append(float(parts[close_idx]))
+                except:
+                    vals.append(None)
+        return vals
     except Exception:
         return []
 
@@ -147,11 +274,111 @@ def _safe_read_csv_rows(path: str, max_rows: int = 200000) -> List[Dict]:
     """
     Read CSV and return rows as list of dicts with keys: date, open, high, low, close, volume.
     Will parse common date column names and numeric columns.
+    Row-shaped adapter over _safe_read_csv_columns.
     """
-    if not os.path.exists(path):
-        logger.info("_safe_read_csv_rows: path not found: %s", path)
+    cols = _safe_read_csv_columns(path, max_rows)
+    if not cols:
         return []
-    rows = []
+    keys = list(cols)
+    return [dict(zip(keys, vals)) for vals in zip(*cols.values())]
+
+
+def _safe_read_csv_columns(path: str, max_rows: int = 200000) -> Dict[str, list]:
+    """
+    Read CSV into columns {date, open, high, low, close, volume} -> equal-length lists
+    (missing values are None). Returns {} when the file is missing or empty.
+    Results are cached per file until its mtime/size changes.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        logger.info("_safe_read_csv_rows: path not found: %s", path)
+        return {}
+    key = (st.st_mtime_ns, st.st_size, max_rows)
+    with _CSV_CACHE_LOCK:
+        cached = _CSV_CACHE.get(path)
+        if cached and cached[0] == key:
+            _CSV_CACHE.move_to_end(path)
+            return cached[1]
+
+    cols = _parse_csv_columns(path, max_rows)
+    if cols:
+        with _CSV_CACHE_LOCK:
+            _CSV_CACHE[path] = (key, cols, None, None)
+            _CSV_CACHE.move_to_end(path)
+            while len(_CSV_CACHE) > CSV_CACHE_MAX_FILES:
+                _CSV_CACHE.popitem(last=False)
+    return cols
+
+
+def _cached_columns_json(path: str, cols: Dict[str, list]) -> bytes:
+    """JSON-encode columns once per cached file version; reuses the bytes on later calls."""
+    with _CSV_CACHE_LOCK:
+        cached = _CSV_CACHE.get(path)
+        if cached and cached[1] is cols and cached[2] is not None:
+            return cached[2]
+    if orjson is not None:
+        body = orjson.dumps(cols)
+    else:
+        body = json.dumps(cols, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    with _CSV_CACHE_LOCK:
+        cached = _CSV_CACHE.get(path)
+        if cached and cached[1] is cols:
+            _CSV_CACHE[path] = (cached[0], cols, body, cached[3])
+    return body
+
+
+def _cached_date_ordinals(path: str, cols: Dict[str, list]) -> tuple:
+    """
+    (ordinals, is_sorted) for the date column, parsed once per cached file version.
+    Dates that are missing or not ISO formatted get ordinal 0.
+    """
+    with _CSV_CACHE_LOCK:
+        cached = _CSV_CACHE.get(path)
+        if cached and cached[1] is cols and cached[3] is not None:
+            return cached[3]
+    ordinals = np.zeros(len(cols["date"]), dtype=np.int64)
+    for i, d in enumerate(cols["date"]):
+        try:
+            ordinals[i] = datetime.date.fromisoformat(d).toordinal()
+        except (TypeError, ValueError):
+            pass
+    index = (ordinals, bool((ordinals[1:] >= ordinals[:-1]).all()))
+    with _CSV_CACHE_LOCK:
+        cached = _CSV_CACHE.get(path)
+        if cached and cached[1] is cols:
+            _CSV_CACHE[path] = (cached[0], cols, cached[2], index)
+    return index
+
+
+def _csv_row_for_date(path: str, target_date: datetime.date, max_rows: int = 200000) -> Optional[Dict]:
+    """
+    Return the last row of the CSV dated target_date (same keys as _safe_read_csv_rows), or None.
+    Bisects the cached date ordinals and builds a dict for the matching row only.
+    """
+    cols = _safe_read_csv_columns(path, max_rows)
+    if not cols:
+        return None
+    ordinals, is_sorted = _cached_date_ordinals(path, cols)
+    target = target_date.toordinal()
+    if is_sorted:
+        idx = int(np.searchsorted(ordinals, target, side="right")) - 1
+    else:
+        # a malformed or out-of-order date breaks the ordering; take the last match instead
+        hits = np.flatnonzero(ordinals == target)
+        idx = int(hits[-1]) if len(hits) else -1
+    if idx < 0 or ordinals[idx] != target:
+        return None
+    return {key: vals[idx] for key, vals in cols.items()}
+
+
+def _parse_csv_columns(path: str, max_rows: int) -> Dict[str, list]:
+    if pd is not None:
+        try:
+            return _read_csv_columns_pandas(path, max_rows)
+        except Exception as e:
+            logger.info("_safe_read_csv_rows: pandas parse failed for %s (%s); using csv module", path, e)
+    cols = {key: [] for key in ROW_FIELDS}
     try:
         with open(path, "r", encoding="utf-8", errors="ignore") as f:
             reader = csv.DictReader(f)
@@ -167,146 +394,206 @@ def _safe_read_csv_rows(path: str, max_rows: int = 200000) -> List[Dict]:
                                 pass
                     return None
                 date_val = None
-                for k in ("date", "Date", "DATE"):
+                for k in ROW_FIELDS["date"]:
                     if k in r and r[k]:
                         date_val = r[k]
                         break
-                rows.append({
-                    "date": date_val,
-                    "open": _get_float(["open", "Open", "OPEN"]),
-                    "high": _get_float(["high", "High", "HIGH"]),
-                    "low": _get_float(["low", "Low", "LOW"]),
-                    "close": _get_float(["close", "Close", "CLOSE", "adj close", "Adj Close"]),
-                    "volume": _get_float(["volume", "Volume", "VOLUME"])
-                })
+                cols["date"].append(date_val)
+                for key in ("open", "high", "low", "close", "volume"):
+                    cols[key].append(_get_float(ROW_FIELDS[key]))
     except Exception as e:
         logger.exception("_safe_read_csv_rows: failed to read %s: %s", path, e)
-        return []
-    return rows
+        return {}
+    return cols if cols["date"] else {}
+
+
+def _read_csv_columns_pandas(path: str, max_rows: int) -> Dict[str, list]:
+    """C-engine parse into the same columns _parse_csv_columns returns."""
+    wanted = {c for names in ROW_FIELDS.values() for c in names}
+    date_cols = set(ROW_FIELDS["date"])
+    df = pd.read_csv(path, engine="c", usecols=lambda c: c in wanted, nrows=max_rows,
+                     dtype={c: str for c in date_cols}, keep_default_na=False,
+                     na_values=[""], float_precision="round_trip",
+                     encoding="utf-8", encoding_errors="ignore")
+    n = len(df)
+    if n == 0:
+        return {}
+    out_cols = {}
+    for key, names in ROW_FIELDS.items():
+        present = [c for c in names if c in df.columns]
+        if not present:
+            out_cols[key] = [None] * n
+            continue
+        if key == "date":
+            col = df[present[0]]
+            for c in present[1:]:
+                col = col.fillna(df[c])
+        else:
+            col = pd.to_numeric(df[present[0]], errors="coerce").astype("float64")
+            for c in present[1:]:
+                col = col.fillna(pd.to_numeric(df[c], errors="coerce"))
+        if col.hasnans:
+            col = col.astype(object).where(col.notna(), None)
+        out_cols[key] = col.tolist()
+    return out_cols
 
 
 # ---------------- adv/decl (uses CSV or yfinance fallback) ----------------
-def get_adv_decline(exchange: str = "NSE", sample_limit: int = 800) -> Dict[str, int]:
-    """
-    Prefer CSV-based adv/decline. If CSVs not available or don't contain data,
-    fall back to yfinance batch download for a sampled list of tickers.
-    Returns {"adv": int, "dec": int}
-    """
-    adv = 1520
-    dec = 720
-
-    files = list_tickers(exchange)
-    if files:
-        used = 0
-        for entry in files[:sample_limit]:
-            fname = entry["file"]
-            folder = get_data_folder(exchange)
-            if not folder:
-                continue
-            path = os.path.join(folder, f"{fname.replace('.', '_')}.csv")
-            vals = read_last_n_close_values(path, n=2)
-            if len(vals) >= 2 and vals[-1] is not None and vals[-2] is not None:
+def _fetch_spark_closes(symbols: List[str]) -> Dict[str, tuple]:
+    """
+    {symbol: (prev_close, last_close)} from Yahoo's spark endpoint, SPARK_BATCH_SIZE
+    symbols per request, requests issued concurrently over the shared session.
+    Symbols without two closes are left out.
+    """
+    chunks = [symbols[i:i + SPARK_BATCH_SIZE] for i in range(0, len(symbols), SPARK_BATCH_SIZE)]
+
+    def _fetch(chunk):
+        out = {}
+        try:
+            r = _HTTP.get(SPARK_URL, params={"symbols": ",".join(chunk), "range": "5d", "interval": "1d",
+                                             "indicators": "close"},
+                          headers={"User-Agent": "Mozilla/5.0"}, timeout=6)
+            if r.status_code != 200:
+                logger.info("spark returned %s for %d symbols", r.status_code, len(chunk))
+                return out
+            for item in (r.json().get("spark") or {}).get("result") or []:
                 try:
-                    last = float(vals[-1])
-                    prev = float(vals[-2])
-                    if last > prev:
-                        adv += 1
-                    elif last < prev:
-                        dec += 1
-                    used += 1
-                except Exception:
+                    resp = item["response"][0]
+                    closes = [c for c in resp["indicators"]["quote"][0]["close"] if c is not None]
+                except (KeyError, IndexError, TypeError):
                     continue
-        if used > 0:
-            return {"adv": adv, "dec": dec}
+                if len(closes) >= 2:
+                    out[item.get("symbol")] = (float(closes[-2]), float(closes[-1]))
+        except Exception as e:
+            logger.info("spark fetch failed for %d symbols: %s", len(chunk), e)
+        return out
 
-    # yfinance fallback
-    if yf is None:
-        return {"adv": adv, "dec": dec}
+    pairs = {}
+    for part in _IO_POOL.map(_fetch, chunks):
+        pairs.update(part)
+    return pairs
 
-    symbols = []
-    for entry in files:
-        symbols.append(entry["file"])
-        if len(symbols) >= sample_limit:
-            break
-    if not symbols:
-        return {"adv": adv, "dec": dec}
 
-    try:
-        ticker_str = " ".join(symbols)
+def _fetch_closes_batch(symbols: List[str]):
+    """
+    Recent daily closes (rows=dates, columns=symbols) via chunked yf.download
+    calls run side by side. Returns None when nothing could be fetched.
+    """
+    chunks = [symbols[i:i + YF_BATCH_SIZE] for i in range(0, len(symbols), YF_BATCH_SIZE)]
+
+    def _download(chunk):
         df = None
-        try:
-            df = yf.download(tickers=ticker_str, period="5d", interval="1d", group_by="ticker", threads=True, progress=False)
-        except Exception:
+        for period, interval in (("5d", "1d"), ("7d", "60m")):
             try:
-                df = yf.download(tickers=ticker_str, period="7d", interval="60m", group_by="ticker", threads=True, progress=False)
+                df = yf.download(tickers=" ".join(chunk), period=period, interval=interval,
+                                 group_by="ticker", threads=False, progress=False)
             except Exception as e:
-                print("yfinance batch download failed:", repr(e))
-                df = None
-
+                logger.info("yfinance batch %s/%s failed for %d symbols: %s", period, interval, len(chunk), e)
+                continue
+            if df is not None and not df.empty:
+                break
         if df is None or df.empty:
-            return {"adv": adv, "dec": dec}
+            return None
+        if isinstance(df.columns, pd.MultiIndex):
+            level = 0 if "Close" in df.columns.get_level_values(0) else 1
+            return df.xs("Close", axis=1, level=level)
+        if "Close" in df.columns:
+            return df[["Close"]].rename(columns={"Close": chunk[0]})
+        return None
+
+    with ThreadPoolExecutor(max_workers=min(8, len(chunks))) as ex:
+        parts = [p for p in ex.map(_download, chunks) if p is not None]
+    if not parts:
+        return None
+    return pd.concat(parts, axis=1)
 
-        if hasattr(df.columns, "levels") and len(df.columns.levels) >= 2:
-            tickers_in_df = sorted({t for _, t in df.columns})
-            checked = 0
-            for sym in tickers_in_df:
-                try:
-                    closes = df["Close", sym].dropna()
-                except Exception:
-                    try:
-                        closes = df[("Close", sym)].dropna()
-                    except Exception:
-                        continue
-                if len(closes) >= 2:
-                    last = float(closes.iloc[-1])
-                    prev = float(closes.iloc[-2])
-                    if last > prev:
-                        adv += 1
-                    elif last < prev:
-                        dec += 1
-                    checked += 1
-                if checked >= sample_limit:
-                    break
-            return {"adv": adv, "dec": dec}
-        else:
-            checked = 0
-            for sym in symbols:
-                try:
-                    hist = yf.Ticker(sym).history(period="5d", interval="1d", actions=False)
-                    if hist is None or hist.empty:
-                        continue
-                    closes = hist["Close"].dropna()
-                    if len(closes) >= 2:
-                        last = float(closes.iloc[-1])
-                        prev = float(closes.iloc[-2])
-                        if last > prev:
-                            adv += 1
-                        elif last < prev:
-                            dec += 1
-                        checked += 1
-                    if checked >= sample_limit:
-                        break
-                except Exception:
-                    continue
-            return {"adv": adv, "dec": dec}
-    except Exception as e:
-        print("get_adv_decline: yfinance fallback failed:", repr(e))
-        return {"adv": adv, "dec": dec}
+
+def _tally_closes(closes) -> tuple:
+    """(adv, dec, used) from each column's last two non-NaN closes."""
+    arr = closes.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(arr)
+    # 1 on each column's newest valid row, 2 on the one before it, ...
+    from_end = valid[::-1].cumsum(axis=0)[::-1]
+    cols = np.arange(arr.shape[1])
+
+    def _pick(rank):
+        mask = valid & (from_end == rank)
+        out = arr[mask.argmax(axis=0), cols]
+        out[~mask.any(axis=0)] = np.nan
+        return out
+
+    return _tally_advdec(_pick(1), _pick(2))
 
 
 # small in-memory cache helpers
 def _cache_get(key):
-    rec = _SIMPLE_CACHE.get(key)
-    if not rec:
-        return None
-    value, expiry = rec
-    if time.time() > expiry:
-        _SIMPLE_CACHE.pop(key, None)
-        return None
-    return value
+    with _SIMPLE_CACHE_LOCK:
+        rec = _SIMPLE_CACHE.get(key)
+        if not rec:
+            return None
+        value, expiry = rec
+        if time.monotonic() > expiry:
+            _SIMPLE_CACHE.pop(key, None)
+            return None
+        _SIMPLE_CACHE.move_to_end(key)
+        return value
 
 def _cache_set(key, value, ttl=30):
-    _SIMPLE_CACHE[key] = (value, time.time() + ttl)
+    with _SIMPLE_CACHE_LOCK:
+        _SIMPLE_CACHE[key] = (value, time.monotonic() + ttl)
+        _SIMPLE_CACHE.move_to_end(key)
+        while len(_SIMPLE_CACHE) > SIMPLE_CACHE_MAX:
+            _SIMPLE_CACHE.popitem(last=False)
+
+
+def _single_flight(cache_key: str, fetch, ttl: int):
+    """
+    Return the cached value for cache_key, or run fetch() once across concurrent
+    callers: the first miss fetches and caches, the others wait for it and re-read.
+    """
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+    with _INFLIGHT_LOCK:
+        event = _INFLIGHT.get(cache_key)
+        leader = event is None
+        if leader:
+            event = _INFLIGHT[cache_key] = threading.Event()
+    if not leader:
+        event.wait(timeout=INFLIGHT_WAIT)
+        return _cache_get(cache_key)
+    try:
+        value = fetch()
+        if value is not None:
+            _cache_set(cache_key, value, ttl=ttl)
+        return value
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(cache_key, None)
+        event.set()
+
+
+def _fetch_yf_last(s: str) -> Optional[float]:
+    try:
+        ticker = _TICKER_CACHE.get(s)
+        if ticker is None:
+            ticker = _TICKER_CACHE[s] = yf.Ticker(s)
+        hist = ticker.history(period="5d", interval="1d", actions=False)
+        if hist is None or hist.empty:
+            hist = ticker.history(period="7d", interval="60m", actions=False)
+        if hist is None or hist.empty:
+            logger.info("%s: No price data found (hist empty)", s)
+            return None
+        closes = hist["Close"].dropna()
+        if closes.empty:
+            logger.info("%s: No close values found", s)
+            return None
+        last = float(closes.iloc[-1])
+        logger.info("%s: fetched last=%s", s, last)
+        return last
+    except Exception as e:
+        logger.exception("Failed to get ticker '%s' reason: %s", s, e)
+        return None
 
 
 def fetch_yfinance_last_for_symbols(symbols: list) -> Optional[float]:
@@ -314,47 +601,20 @@ def fetch_yfinance_last_for_symbols(symbols: list) -> Optional[float]:
         logger.info("fetch_yfinance_last_for_symbols: yfinance not available")
         return None
     for s in symbols:
-        cache_key = f"yfin:{s}"
-        cached = _cache_get(cache_key)
-        if cached is not None:
-            return cached
-        try:
-            ticker = yf.Ticker(s)
-            hist = ticker.history(period="5d", interval="1d", actions=False)
-            if hist is None or hist.empty:
-                hist = ticker.history(period="7d", interval="60m", actions=False)
-            if hist is None or hist.empty:
-                logger.info("%s: No price data found (hist empty)", s)
-                continue
-            closes = hist["Close"].dropna()
-            if closes.empty:
-                logger.info("%s: No close values found", s)
-                continue
-            last = float(closes.iloc[-1])
-            _cache_set(cache_key, last, ttl=30)
-            logger.info("%s: fetched last=%s", s, last)
+        last = _single_flight(f"yfin:{s}", lambda s=s: _fetch_yf_last(s), ttl=30)
+        if last is not None:
             return last
-        except Exception as e:
-            logger.exception("Failed to get ticker '%s' reason: %s", s, e)
-            continue
     return None
 
-def fetch_usdinr_with_fallback() -> Optional[float]:
-    val = fetch_yfinance_last_for_symbols(INR_SYMBOLS)
-    if val is not None:
-        return val
+
+def _fetch_exchangerate_usdinr() -> Optional[float]:
     try:
-        cache_key = "fx:USD_INR"
-        cached = _cache_get(cache_key)
-        if cached is not None:
-            return cached
         url = "https://api.exchangerate.host/latest?base=USD&symbols=INR"
-        r = requests.get(url, timeout=6)
+        r = _HTTP.get(url, timeout=6)
         if r.status_code == 200:
             j = r.json()
             rate = j.get("rates", {}).get("INR")
             if rate:
-                _cache_set(cache_key, float(rate), ttl=60)
                 logger.info("Fetched USD/INR from exchangerate.host: %s", rate)
                 return float(rate)
         else:
@@ -363,10 +623,37 @@ def fetch_usdinr_with_fallback() -> Optional[float]:
         logger.exception("exchangerate.host fetch failed: %s", e)
     return None
 
+
+def fetch_usdinr_with_fallback() -> Optional[float]:
+    val = fetch_yfinance_last_for_symbols(INR_SYMBOLS)
+    if val is not None:
+        return val
+    return _single_flight("fx:USD_INR", _fetch_exchangerate_usdinr, ttl=60)
+
 def fetch_vix_with_fallback() -> Optional[float]:
     return fetch_yfinance_last_for_symbols(VIX_SYMBOLS)
 
 
+def _market_status(now_ist: datetime.datetime) -> str:
+    """
+    "OPEN" on weekdays between MARKET_OPEN and MARKET_CLOSE IST, else "CLOSED".
+    The status only flips at those boundaries (or midnight), so it is cached
+    until the next one instead of being recomputed per request.
+    """
+    now_ts = now_ist.timestamp()
+    if now_ts < _STATUS_STATE["valid_until"]:
+        return _STATUS_STATE["status"]
+
+    t = now_ist.time()
+    is_open = now_ist.weekday() < 5 and MARKET_OPEN <= t <= MARKET_CLOSE
+    today = now_ist.date()
+    boundaries = [IST.localize(datetime.datetime.combine(today, b)) for b in (MARKET_OPEN, MARKET_CLOSE)]
+    boundaries.append(IST.localize(datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time(0, 0))))
+    _STATUS_STATE["status"] = "OPEN" if is_open else "CLOSED"
+    _STATUS_STATE["valid_until"] = min(b.timestamp() for b in boundaries if b.timestamp() > now_ts)
+    return _STATUS_STATE["status"]
+
+
 # ---------------- API endpoints ----------------
 @router.get("/api/tickers")
 def api_tickers(exchange: str = "NSE"):
@@ -380,20 +667,22 @@ def api_tickers(exchange: str = "NSE"):
 
 
 @router.get("/api/header")
-def api_header(exchange: str = "NSE"):
+async def api_header(exchange: str = "NSE"):
     """Return header payload: time, market_status, adv/dec, usdinr, vix."""
     try:
-        ist = pytz.timezone("Asia/Kolkata")
-        now_ist = datetime.datetime.now(ist)
+        now_ist = datetime.datetime.now(IST)
         time_str = now_ist.strftime("%H:%M:%S IST")
-
-        is_weekday = now_ist.weekday() < 5
-        is_market_time = (now_ist.time() >= datetime.time(9, 15)) and (now_ist.time() <= datetime.time(15, 30))
-        market_status = "OPEN" if (is_weekday and is_market_time) else "CLOSED"
+        market_status = _market_status(now_ist)
 
         advdec = get_cached_advdec()
-        usdinr = fetch_usdinr_with_fallback()
-        vix = fetch_vix_with_fallback()
+        # advdec_updater keeps these warm; only fetch (off the event loop) until its first refresh lands
+        usdinr = _ADVDEC_CACHE.get("usdinr")
+        vix = _ADVDEC_CACHE.get("vix")
+        if usdinr is None or vix is None:
+            usdinr, vix = await asyncio.gather(
+                asyncio.to_thread(fetch_usdinr_with_fallback),
+                asyncio.to_thread(fetch_vix_with_fallback),
+            )
 
         return {
             "time": time_str,
@@ -404,8 +693,9 @@ def api_header(exchange: str = "NSE"):
             "vix": vix
         }
     except Exception:
-        logger.exception("api_header error")
-        return {"error": "internal", "trace": traceback.format_exc()}
+        err_id = uuid.uuid4().hex[:12]
+        logger.exception("api_header error id=%s", err_id)
+        return {"error": "internal", "id": err_id}
 
 
 # ---------- adv/dec background updater ----------
@@ -423,127 +713,208 @@ def _simulate_adv_decl(exchange: str = "NSE"):
     return {"adv": int(_ADVDEC_CACHE.get("adv", 1520)), "dec": int(_ADVDEC_CACHE.get("dec", 720))}
 
 
+def _advdec_snapshot_path(exch: str) -> Optional[Path]:
+    folder = get_data_folder(exch)
+    if not folder:
+        return None
+    return Path(folder).parents[1] / "temp" / f"advdec_snapshot_{exch}.parquet"
+
+
+def _load_advdec_snapshot(exch: str) -> Dict[str, tuple]:
+    """Seed the in-memory snapshot from data/temp/advdec_snapshot_<exchange>.parquet, if any."""
+    path = _advdec_snapshot_path(exch)
+    if pd is None or path is None or not path.exists():
+        return {}
+    try:
+        df = pd.read_parquet(path, columns=["file", "mtime", "last", "prev"])
+        # rows are keyed by file name so the snapshot survives the data folder moving
+        prefix = os.path.join(get_data_folder(exch), "")
+        return {prefix + f: (m, l, v) for f, m, l, v in zip(df["file"].tolist(), df["mtime"].tolist(),
+                                                            df["last"].tolist(), df["prev"].tolist())}
+    except Exception as e:
+        logger.info("_load_advdec_snapshot: ignoring unreadable snapshot %s: %s", path, e)
+        return {}
+
+
+def _save_advdec_snapshot(exch: str, snap: Dict[str, tuple]) -> None:
+    path = _advdec_snapshot_path(exch)
+    _ADVDEC_SAVED_AT[exch] = time.monotonic()
+    if pd is None or path is None:
+        return
+    try:
+        recs = list(snap.values())
+        df = pd.DataFrame({
+            "file": [os.path.basename(p) for p in snap],
+            "mtime": np.fromiter((r[0] for r in recs), dtype=np.int64, count=len(recs)),
+            "last": np.fromiter((r[1] for r in recs), dtype=np.float64, count=len(recs)),
+            "prev": np.fromiter((r[2] for r in recs), dtype=np.float64, count=len(recs)),
+        })
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path, index=False)
+        _ADVDEC_DIRTY.discard(exch)
+    except Exception as e:
+        logger.info("_save_advdec_snapshot: could not write snapshot %s: %s", path, e)
+
+
+def _build_advdec_snapshot(exchange: str = "NSE", sample_limit: int = 800):
+    """
+    Return (last, prev) float64 arrays of the two most recent closes per CSV.
+    Only files whose mtime changed since the previous cycle are re-read;
+    missing values are NaN.
+    """
+    exch = (exchange or "NSE").upper()
+    if exch not in _ADVDEC_SNAPSHOT:
+        _ADVDEC_SNAPSHOT[exch] = _load_advdec_snapshot(exch)
+    old = _ADVDEC_SNAPSHOT[exch]
+    snap = {}
+    stale = []
+    for _, _, path in _ticker_entries(exch)[:sample_limit]:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        rec = old.get(path)
+        if rec is None or rec[0] != mtime:
+            stale.append((path, mtime))
+            rec = None
+        snap[path] = rec
+
+    # re-tail changed files concurrently
+    results = _IO_POOL.map(lambda p: read_last_n_close_values(p, n=2), [p for p, _ in stale])
+    for (path, mtime), vals in zip(stale, results):
+        if len(vals) >= 2:
+            last = vals[-1] if vals[-1] is not None else np.nan
+            prev = vals[-2] if vals[-2] is not None else np.nan
+        else:
+            last = prev = np.nan
+        snap[path] = (mtime, last, prev)
+    _ADVDEC_SNAPSHOT[exch] = snap
+    if stale or len(snap) != len(old):
+        _ADVDEC_DIRTY.add(exch)
+    if exch in _ADVDEC_DIRTY and time.monotonic() - _ADVDEC_SAVED_AT.get(exch, 0.0) >= ADVDEC_PERSIST_INTERVAL:
+        _save_advdec_snapshot(exch, snap)
+    # one C-level conversion of the (mtime, last, prev) records, then column views
+    recs = np.array(list(snap.values()), dtype=np.float64).reshape(-1, 3)
+    return recs[:, 1], recs[:, 2]
+
+
+def _tally_advdec(last: np.ndarray, prev: np.ndarray):
+    """Return (adv, dec, used) from one difference pass; NaN rows compare false and are skipped."""
+    diff = last - prev
+    used = diff.size - int(np.isnan(diff).sum())
+    return int(np.count_nonzero(diff > 0)), int(np.count_nonzero(diff < 0)), used
+
+
 def compute_adv_decl_from_csv_or_yf(exchange: str = "NSE", sample_limit: int = 800) -> Dict[str, int]:
+    """
+    Adv/decline from the CSV snapshot, falling back to a yfinance batch download.
+    Memoized for ADVDEC_TTL seconds per (exchange, sample_limit), shorter than the
+    updater's cadence so only extra callers hit the cache.
+    """
+    cache_key = f"advdec:{(exchange or 'NSE').upper()}:{sample_limit}"
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    res = _compute_adv_decl(exchange, sample_limit)
+    _cache_set(cache_key, res, ttl=ADVDEC_TTL)
+    return dict(res)
+
+
+def _compute_adv_decl(exchange: str, sample_limit: int) -> Dict[str, int]:
     adv = 0
     dec = 0
     used_csv = 0
-    files = list_tickers(exchange)
-    folder = get_data_folder(exchange)
-    if files and folder:
-        for entry in files[:sample_limit]:
-            fname = entry["file"]
-            path = os.path.join(folder, f"{fname.replace('.', '_')}.csv")
-            vals = read_last_n_close_values(path, n=2)
-            if len(vals) >= 2 and vals[-1] is not None and vals[-2] is not None:
-                try:
-                    last = float(vals[-1]); prev = float(vals[-2])
-                    if last > prev: adv += 1
-                    elif last < prev: dec += 1
-                    used_csv += 1
-                except Exception:
-                    continue
+    entries, files = _ticker_listing(exchange)
+    if entries:
+        adv, dec, used_csv = _tally_advdec(*_build_advdec_snapshot(exchange, sample_limit))
     if used_csv > 0:
         return {"adv": adv, "dec": dec}
 
-    if yf is None:
-        return {"adv": adv, "dec": dec}
-
-    symbols = [e["file"] for e in files[:sample_limit]] if files else []
+    symbols = [e["file"] for e in files[:sample_limit]]
     if not symbols:
         return {"adv": adv, "dec": dec}
-
     try:
-        ticker_str = " ".join(symbols)
-        df = None
-        try:
-            df = yf.download(tickers=ticker_str, period="5d", interval="1d", group_by="ticker", threads=True, progress=False)
-        except Exception:
-            try:
-                df = yf.download(tickers=ticker_str, period="7d", interval="60m", group_by="ticker", threads=True, progress=False)
-            except Exception as e:
-                logger.exception("advdec yfinance batch failed: %s", e)
-                df = None
-        if df is None or df.empty:
-            checked = 0
-            for s in symbols:
-                try:
-                    hist = yf.Ticker(s).history(period="5d", interval="1d", actions=False)
-                    if hist is None or hist.empty:
-                        continue
-                    closes = hist["Close"].dropna()
-                    if len(closes) >= 2:
-                        last = float(closes.iloc[-1]); prev = float(closes.iloc[-2])
-                        if last > prev: adv += 1
-                        elif last < prev: dec += 1
-                        checked += 1
-                    if checked >= sample_limit:
-                        break
-                except Exception:
-                    continue
-            return {"adv": adv, "dec": dec}
-
-        checked = 0
-        if hasattr(df.columns, "levels") and len(df.columns.levels) >= 2:
-            tickers_in_df = sorted({t for _, t in df.columns})
-            for sym in tickers_in_df:
-                try:
-                    closes = df["Close", sym].dropna()
-                except Exception:
-                    try:
-                        closes = df[("Close", sym)].dropna()
-                    except Exception:
-                        continue
-                if len(closes) >= 2:
-                    last = float(closes.iloc[-1]); prev = float(closes.iloc[-2])
-                    if last > prev: adv += 1
-                    elif last < prev: dec += 1
-                    checked += 1
-                if checked >= sample_limit:
-                    break
-            return {"adv": adv, "dec": dec}
-        else:
-            checked = 0
-            for s in symbols:
-                try:
-                    hist = yf.Ticker(s).history(period="5d", interval="1d", actions=False)
-                    if hist is None or hist.empty:
-                        continue
-                    closes = hist["Close"].dropna()
-                    if len(closes) >= 2:
-                        last = float(closes.iloc[-1]); prev = float(closes.iloc[-2])
-                        if last > prev: adv += 1
-                        elif last < prev: dec += 1
-                        checked += 1
-                    if checked >= sample_limit:
-                        break
-                except Exception:
-                    continue
-            return {"adv": adv, "dec": dec}
+        pairs = _fetch_spark_closes(symbols)
+        if pairs:
+            prev = np.fromiter((p for p, _ in pairs.values()), dtype=np.float64, count=len(pairs))
+            last = np.fromiter((l for _, l in pairs.values()), dtype=np.float64, count=len(pairs))
+            adv, dec, _ = _tally_advdec(last, prev)
+        elif yf is not None:
+            closes = _fetch_closes_batch(symbols)
+            if closes is not None:
+                adv, dec, _ = _tally_closes(closes)
     except Exception as e:
         logger.exception("compute_adv_decl_from_csv_or_yf failed: %s", e)
-        return {"adv": adv, "dec": dec}
+    return {"adv": adv, "dec": dec}
+
+
+def _advdec_cycle(exchange: str, sample_limit: int, last_fx: Optional[float]) -> Optional[float]:
+    """
+    One updater pass: recompute adv/dec into _ADVDEC_CACHE and, when FX_REFRESH_INTERVAL
+    has elapsed since last_fx, refresh USD/INR and VIX. Returns the new last_fx stamp.
+    """
+    try:
+        res = compute_adv_decl_from_csv_or_yf(exchange=exchange, sample_limit=sample_limit)
+        _ADVDEC_CACHE["adv"] = int(res.get("adv", 0))
+        _ADVDEC_CACHE["dec"] = int(res.get("dec", 0))
+        _ADVDEC_CACHE["ts"] = int(time.time())
+    except Exception as e:
+        logger.exception("advdec_updater cycle error: %s", e)
+    if last_fx is None or time.monotonic() - last_fx >= FX_REFRESH_INTERVAL:
+        try:
+            _refresh_fx_cache()
+        except Exception as e:
+            logger.exception("advdec_updater fx refresh error: %s", e)
+        last_fx = time.monotonic()
+    return last_fx
 
 
 def advdec_updater(loop_delay: int = 15, exchange: str = "NSE", sample_limit: int = 800):
     """
     Blocking function to be run in background thread or asyncio task.
-    Periodically computes adv/dec and stores in _ADVDEC_CACHE.
+    Periodically computes adv/dec and stores in _ADVDEC_CACHE; USD/INR and VIX
+    are refreshed there too (every FX_REFRESH_INTERVAL seconds) so /api/header
+    never fetches on the request path.
     """
     logger.info("Starting adv/dec background updater (delay=%ss)", loop_delay)
+    last_fx = None
     try:
         while True:
-            try:
-                res = compute_adv_decl_from_csv_or_yf(exchange=exchange, sample_limit=sample_limit)
-                _ADVDEC_CACHE["adv"] = int(res.get("adv", 0))
-                _ADVDEC_CACHE["dec"] = int(res.get("dec", 0))
-                _ADVDEC_CACHE["ts"] = int(time.time())
-            except Exception as e:
-                logger.exception("advdec_updater cycle error: %s", e)
+            last_fx = _advdec_cycle(exchange, sample_limit, last_fx)
             time.sleep(loop_delay)
     except Exception as e:
         logger.exception("advdec_updater terminated: %s", e)
 
 
+async def advdec_updater_async(loop_delay: int = 15, exchange: str = "NSE", sample_limit: int = 800):
+    """
+    Event-loop version of advdec_updater: each cycle runs on a worker thread
+    (file reads and HTTP are blocking) and the wait between cycles is an
+    asyncio.sleep, so no thread is held while idle.
+    """
+    logger.info("Starting async adv/dec background updater (delay=%ss)", loop_delay)
+    last_fx = None
+    try:
+        while True:
+            last_fx = await asyncio.to_thread(_advdec_cycle, exchange, sample_limit, last_fx)
+            await asyncio.sleep(loop_delay)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.exception("advdec_updater_async terminated: %s", e)
+
+
+def _refresh_fx_cache() -> None:
+    """Fetch USD/INR and VIX concurrently; keep the previous value when a fetch fails."""
+    fx = _IO_POOL.submit(fetch_usdinr_with_fallback)
+    vix = fetch_vix_with_fallback()
+    usdinr = fx.result()
+    if usdinr is not None:
+        _ADVDEC_CACHE["usdinr"] = usdinr
+    if vix is not None:
+        _ADVDEC_CACHE["vix"] = vix
+
+
 def get_cached_advdec() -> Dict[str, int]:
     """Return cached adv/dec (may be stale if not yet computed)"""
     return {"adv": int(_ADVDEC_CACHE.get("adv", 0)),
@@ -568,6 +939,47 @@ def _try_variants_for_file_ticker(q: str, exchange: str):
     yield q0
 
 
+def _resolve_index(exchange: str = "NSE") -> Optional[Dict]:
+    """
+    Lookup tables for _resolve_to_file_ticker, rebuilt only when the data
+    folder's mtime changes (i.e. a CSV was added or removed).
+    """
+    exch = (exchange or "NSE").upper()
+    folder = get_data_folder(exch)
+    if not folder:
+        return None
+    try:
+        sig = (folder, os.stat(folder).st_mtime_ns)
+    except OSError:
+        return None
+    cached = _RESOLVE_CACHE.get(exch)
+    if cached and cached[0] == sig:
+        return cached[1]
+
+    names = os.listdir(folder)
+    file_map = {}
+    display_map = {}
+    for f in sorted(names):
+        if not f.lower().endswith(".csv"):
+            continue
+        file_ticker = os.path.splitext(f)[0].replace("_", ".")
+        file_map[file_ticker.upper()] = file_ticker
+        display_map[clean_ticker(file_ticker).upper()] = file_ticker
+    # display names bucketed by their first 1..4 characters, in display_map order
+    by_prefix = defaultdict(list)
+    for disp in display_map:
+        for k in range(1, min(4, len(disp)) + 1):
+            by_prefix[disp[:k]].append(disp)
+    index = {
+        "file_map": file_map,
+        "display_map": display_map,
+        "lower_files": {f.lower(): f for f in names},
+        "by_prefix": dict(by_prefix),
+    }
+    _RESOLVE_CACHE[exch] = (sig, index)
+    return index
+
+
 def _resolve_to_file_ticker(query: str, exchange: str = "NSE") -> Optional[str]:
     """
     Tolerant resolution:
@@ -577,9 +989,12 @@ def _resolve_to_file_ticker(query: str, exchange: str = "NSE") -> Optional[str]:
     if not query:
         return None
     q = _normalize_query(query)
-    candidates = list_tickers(exchange)
-    file_map = {c["file"].upper(): c["file"] for c in candidates}
-    display_map = {c["display"].upper(): c["file"] for c in candidates}
+    index = _resolve_index(exchange)
+    if not index:
+        logger.info("_resolve_to_file_ticker: no data folder for exchange '%s'", exchange)
+        return None
+    file_map = index["file_map"]
+    display_map = index["display_map"]
 
     # try variants
     for variant in _try_variants_for_file_ticker(q, exchange):
@@ -596,25 +1011,25 @@ def _resolve_to_file_ticker(query: str, exchange: str = "NSE") -> Optional[str]:
         logger.info("_resolve_to_file_ticker: display exact %s -> %s", q, display_map[q])
         return display_map[q]
 
-    # partial match
+    # partial match: prefix via the index, then substring
+    for disp in index["by_prefix"].get(q[:4], ()):
+        if disp.startswith(q):
+            logger.info("_resolve_to_file_ticker: partial %s -> %s (display %s)", q, display_map[disp], disp)
+            return display_map[disp]
     for disp, file in display_map.items():
-        if disp.startswith(q) or q in disp:
+        if q in disp:
             logger.info("_resolve_to_file_ticker: partial %s -> %s (display %s)", q, file, disp)
             return file
 
     # case-insensitive filename search in folder
-    folder = get_data_folder(exchange)
-    if folder:
-        want = [v for v in _try_variants_for_file_ticker(q, exchange)]
-        files = os.listdir(folder)
-        lower_map = {f.lower(): f for f in files}
-        for v in want:
-            candidate_fname = f"{v.replace('.', '_')}.csv".lower()
-            if candidate_fname in lower_map:
-                real = lower_map[candidate_fname]
-                resolved = os.path.splitext(real)[0].replace("_", ".")
-                logger.info("_resolve_to_file_ticker: case-insensitive match %s -> %s", real, resolved)
-                return resolved
+    lower_map = index["lower_files"]
+    for v in _try_variants_for_file_ticker(q, exchange):
+        candidate_fname = f"{v.replace('.', '_')}.csv".lower()
+        if candidate_fname in lower_map:
+            real = lower_map[candidate_fname]
+            resolved = os.path.splitext(real)[0].replace("_", ".")
+            logger.info("_resolve_to_file_ticker: case-insensitive match %s -> %s", real, resolved)
+            return resolved
 
     logger.info("_resolve_to_file_ticker: no match for '%s' exchange '%s'", q, exchange)
     return None
@@ -641,22 +1056,26 @@ def api_stock(query: str, exchange: str = "NSE"):
         path = os.path.join(folder, filename)
         if not os.path.exists(path):
             found = None
-            if os.path.isdir(folder):
-                for f in os.listdir(folder):
-                    if f.lower() == filename.lower():
-                        found = os.path.join(folder, f)
-                        break
+            index = _resolve_index(exchange)
+            real = index["lower_files"].get(filename.lower()) if index else None
+            if real:
+                found = os.path.join(folder, real)
             if not found:
                 logger.info("api_stock: resolved file not found: %s expected at %s", filename, path)
                 return JSONResponse(status_code=404, content={"error": "file_not_found", "file": filename, "resolved_file_ticker": file_ticker, "search_folder": folder})
             path = found
 
-        rows = _safe_read_csv_rows(path)
-        if not rows:
+        cols = _safe_read_csv_columns(path)
+        if not cols:
             logger.info("api_stock: file found but no rows or parse error: %s", path)
             return JSONResponse(status_code=404, content={"error": "empty_file_or_parse_error", "file": os.path.basename(path)})
 
-        return {"file": file_ticker, "symbol": file_ticker.split(".")[0], "exchange": exchange, "data": rows}
+        # columnar payload; splice the cached columns JSON into the envelope instead of re-encoding
+        head = json.dumps({"file": file_ticker, "symbol": file_ticker.split(".")[0], "exchange": exchange,
+                           "nrows": len(cols["date"])}, ensure_ascii=False, separators=(",", ":"))
+        content = head[:-1].encode("utf-8") + b',"columns":' + _cached_columns_json(path, cols) + b"}"
+        return Response(content=content, media_type="application/json")
     except Exception:
-        logger.exception("api_stock: internal error for query=%s exchange=%s", query, exchange)
-        return JSONResponse(status_code=500, content={"error": "internal", "trace": traceback.format_exc()})
+        err_id = uuid.uuid4().hex[:12]
+        logger.exception("api_stock: internal error id=%s for query=%s exchange=%s", err_id, query, exchange)
+        return JSONResponse(status_code=500, content={"error": "internal", "id": err_id})
@@ -1,10 +1,20 @@
 # indices_api.py
 from fastapi import APIRouter
-import yfinance as yf
 import traceback
+from typing import Dict, Optional
+from header_api import _cache_get, _cache_set
+
+# optional: yfinance
+try:
+    import yfinance as yf
+except Exception:
+    yf = None
 
 router = APIRouter()
 
+# yf.Ticker objects reused across requests (they keep yfinance's session/cookies warm)
+_TICKER_CACHE: Dict[str, "yf.Ticker"] = {}
+
 # ✅ Correct working Yahoo symbols
 INDEX_MAP = {
     "SENSEX": "^BSESN",
@@ -14,6 +24,7 @@ INDEX_MAP = {
     "SMALLCAP 250": "^NSMIDCP",  # ✅ Working
     "GOLD": "GOLDBEES.NS",
 }
+INDICES_TTL = 30
 
 def format_inr(value: float) -> str:
     """Return value formatted with Indian comma style: 81,588.02"""
@@ -22,28 +33,45 @@ def format_inr(value: float) -> str:
     except Exception:
         return str(round(value, 2))
 
+def _get_ticker(yfsymbol: str):
+    ticker = _TICKER_CACHE.get(yfsymbol)
+    if ticker is None:
+        ticker = _TICKER_CACHE[yfsymbol] = yf.Ticker(yfsymbol)
+    return ticker
+
+
+def _index_payload(symbol: str, closes) -> Optional[dict]:
+    """Build the card payload for one index from its daily Close series."""
+    closes = closes.dropna()
+    if len(closes) < 2:
+        return None
+
+    last = float(closes.iloc[-1])
+    prev = float(closes.iloc[-2])
+    change = last - prev
+    pct = (change / prev) * 100 if prev != 0 else 0
+
+    spark = [round(v, 2) for v in closes.tail(7).tolist()]
+
+    return {
+        "name": symbol,
+        "value": format_inr(last),
+        "change": round(change, 2),
+        "changePercent": round(pct, 2),
+        "sparkline": spark,
+    }
+
+
 def get_index_data(symbol: str, yfsymbol: str):
+    if yf is None:
+        return None
     try:
-        ticker = yf.Ticker(yfsymbol)
+        ticker = _get_ticker(yfsymbol)
         data = ticker.history(period="5d", interval="1d")
         if data is None or data.empty or len(data) < 2:
             print(f"⚠️ No data for {symbol} ({yfsymbol})")
             return None
-
-        last = float(data["Close"].iloc[-1])
-        prev = float(data["Close"].iloc[-2])
-        change = last - prev
-        pct = (change / prev) * 100 if prev != 0 else 0
-
-        spark = [round(v, 2) for v in data["Close"].tail(7).tolist()]
-
-        return {
-            "name": symbol,
-            "value": format_inr(last),
-            "change": round(change, 2),
-            "changePercent": round(pct, 2),
-            "sparkline": spark,
-        }
+        return _index_payload(symbol, data["Close"])
 
     except Exception as e:
         print(f"❌ Error fetching {symbol}: {e}")
@@ -51,11 +79,39 @@ def get_index_data(symbol: str, yfsymbol: str):
         return None
 
 
+def _download_index_closes() -> Dict[str, object]:
+    """Close series for every INDEX_MAP symbol from a single yf.download call."""
+    if yf is None:
+        return {}
+    syms = list(INDEX_MAP.values())
+    try:
+        df = yf.download(" ".join(syms), period="5d", interval="1d", group_by="ticker",
+                         threads=True, progress=False)
+    except Exception as e:
+        print(f"❌ Batch index download failed: {e}")
+        return {}
+    if df is None or df.empty or not hasattr(df.columns, "levels"):
+        return {}
+    level = 0 if "Close" in df.columns.get_level_values(0) else 1
+    closes = df.xs("Close", axis=1, level=level)
+    return {sym: closes[sym] for sym in syms if sym in closes.columns}
+
+
 @router.get("/api/indices")
 def api_indices():
+    cached = _cache_get("indices")
+    if cached is not None:
+        return cached
+    closes = _download_index_closes()
     result = []
     for name, sym in INDEX_MAP.items():
-        d = get_index_data(name, sym)
+        # fall back to a per-symbol fetch for anything the batch call missed
+        d = _index_payload(name, closes[sym]) if sym in closes else None
+        if d is None:
+            d = get_index_data(name, sym)
         if d:
             result.append(d)
-    return {"items": result}
+    payload = {"items": result}
+    if result:
+        _cache_set("indices", payload, ttl=INDICES_TTL)
+    return payload
@@ -1,6 +1,7 @@
 # main.py (patch snippet)
-import threading
-from header_api import advdec_updater
+import asyncio
+import anyio.to_thread
+from header_api import advdec_updater_async
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -45,8 +46,28 @@ from marketscreener_api import router as marketscreener_router
 app.include_router(marketscreener_router)
 
 
+# strong references to background tasks so they aren't garbage collected
+_background_tasks = set()
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # run the adv/dec updater on the event loop; it sleeps with asyncio.sleep between cycles
+    task = asyncio.create_task(advdec_updater_async(loop_delay=15, exchange="NSE", sample_limit=800))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in list(_background_tasks):
+        task.cancel()
+
+
 @app.on_event("startup")
-def start_background_tasks():
-    # run advdec_updater in a daemon thread so it doesn't block shutdown
-    t = threading.Thread(target=advdec_updater, kwargs={"loop_delay": 15, "exchange": "NSE", "sample_limit": 800}, daemon=True)
-    t.start()
\ No newline at end of file
+async def configure_thread_limiter():
+    # Sync endpoints and run_in_threadpool work go through anyio.to_thread, which allows
+    # 40 threads at once by default. Each sync handler holds its thread while it blocks
+    # on file or network I/O, so raise the cap to 64 to stop concurrent requests from
+    # queueing. asyncio.to_thread uses the loop's default executor, not this limiter.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 64